@@ -0,0 +1,50 @@
+"""Shared fixtures: tools/ on sys.path and the cached corpus, resolved without network access."""
+from __future__ import annotations
+
+import copy
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import resolve_placeholders as rp  # noqa: E402
+
+
+@dataclass
+class Corpus:
+    """champion_meta.js, a scratch SpellStore synced from data/cdragon_cache and the unresolved text per locale."""
+
+    meta: Dict[str, Dict[str, object]]
+    aliases: Dict[str, str]
+    store: rp.SpellStore
+    texts: Dict[str, Dict[str, Dict[str, object]]]
+
+    def resolve(self, metrics: Optional[rp.RunMetrics] = None) -> Dict[str, Dict[str, object]]:
+        """Resolve a fresh copy of every locale with new resolvers; returns locale -> champion -> entry."""
+        texts = [(locale, copy.deepcopy(data)) for locale, data in self.texts.items()]
+        champions = rp.available_champions(self.meta, self.aliases, self.store, {})
+        for _, champion in rp.iter_champions(champions, self.store, self.texts["en"]):
+            rp.resolve_champion(champion, texts, metrics or rp.RunMetrics())
+        return dict(texts)
+
+
+@pytest.fixture(scope="session")
+def corpus(tmp_path_factory: pytest.TempPathFactory) -> Corpus:
+    meta = rp.load_js_document(rp.BASE_DIR / "champion_meta.js")["LOL_CHAMPIONS_META"].value
+    aliases = {name: rp.normalize_alias(entry.get("id", name)) for name, entry in meta.items()}
+    texts = {}
+    for locale, path in rp.discover_locales().items():
+        data, _ = rp.load_js_object(path, rp.text_var_name(locale))
+        texts[locale] = {
+            name: rp.source_entry(entry, meta[name].get("id", name), locale) or entry
+            for name, entry in data.items()
+            if name in meta and isinstance(entry, dict)
+        }
+    store = rp.SpellStore(tmp_path_factory.mktemp("store") / "spells.sqlite")
+    store.sync(aliases.values())
+    yield Corpus(meta, aliases, store, texts)
+    store.close()
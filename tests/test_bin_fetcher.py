@@ -0,0 +1,230 @@
+"""BinFetcher against a local http.server stand-in for Community Dragon."""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pytest
+
+import resolve_placeholders as rp
+
+
+class StandIn(ThreadingHTTPServer):
+    """Serves /<alias>.bin.json from ``files`` and records what the fetcher sent."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.lock = threading.Lock()
+        self.files: Dict[str, bytes] = {}
+        self.etags: Dict[str, str] = {}
+        self.failures: Dict[str, List[int]] = {}
+        self.truncated: set = set()
+        self.delay = 0.0
+        self.requests: List[Dict[str, Optional[str]]] = []
+        self.clients: set = set()
+        self.inflight = 0
+        self.peak = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{{alias}}.bin.json"
+
+    def count(self, alias: str) -> int:
+        return sum(1 for request in self.requests if request["alias"] == alias)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandIn
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        server = self.server
+        alias = self.path.strip("/").split(".", 1)[0]
+        with server.lock:
+            server.requests.append({"alias": alias, "if_none_match": self.headers.get("If-None-Match"),
+                                    "if_modified_since": self.headers.get("If-Modified-Since")})
+            server.clients.add(self.client_address)
+            server.inflight += 1
+            server.peak = max(server.peak, server.inflight)
+            failures = server.failures.get(alias)
+            status = failures.pop(0) if failures else None
+        try:
+            time.sleep(server.delay)
+            if status is None and alias not in server.files:
+                status = 404
+            if status is not None:
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            etag = server.etags.get(alias)
+            if etag and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = server.files[alias]
+            self.send_response(200)
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", "Tue, 01 Jul 2025 00:00:00 GMT")
+            if alias in server.truncated:
+                self.send_header("Content-Length", str(len(body) * 2))
+                self.end_headers()
+                self.wfile.write(body)
+                self.close_connection = True
+                return
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.inflight -= 1
+
+
+@pytest.fixture
+def server() -> Iterator[StandIn]:
+    stand_in = StandIn()
+    thread = threading.Thread(target=stand_in.serve_forever, daemon=True)
+    thread.start()
+    yield stand_in
+    stand_in.shutdown()
+    stand_in.server_close()
+
+
+def payload(alias: str, version: int = 1) -> bytes:
+    return json.dumps({f"Characters/{alias}/Spells/{alias}Q": {"mSpell": {"version": version}}}).encode("utf-8")
+
+
+def fetcher(server: StandIn, cache_dir: Path, **options) -> rp.BinFetcher:
+    options.setdefault("backoff", 0.0)
+    options.setdefault("timeout", 5.0)
+    options.setdefault("patch", "1.0")
+    return rp.BinFetcher(cache_dir, server.url, **options)
+
+
+def leftovers(cache_dir: Path) -> List[str]:
+    return sorted(path.name for path in cache_dir.iterdir() if path.name.endswith(".tmp"))
+
+
+def test_downloads_and_records_the_patch(server: StandIn, tmp_path: Path):
+    server.files = {"ahri": payload("Ahri"), "jax": payload("Jax")}
+    with fetcher(server, tmp_path) as bins:
+        assert bins.prefetch(["ahri", "jax", "ahri"]) == {}
+        assert bins.prefetch(["ahri", "jax"]) == {}
+    assert len(server.requests) == 2
+    assert (tmp_path / "ahri.bin.json").read_bytes() == server.files["ahri"]
+    manifest = json.loads((tmp_path / rp.CACHE_MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert manifest["entries"]["jax"] == {"patch": "1.0"}
+    assert leftovers(tmp_path) == []
+
+
+def test_retries_transient_errors(server: StandIn, tmp_path: Path):
+    server.files = {"ahri": payload("Ahri")}
+    server.failures = {"ahri": [503, 429]}
+    with fetcher(server, tmp_path, retries=2) as bins:
+        assert bins.prefetch(["ahri"]) == {}
+    assert server.count("ahri") == 3
+    assert (tmp_path / "ahri.bin.json").read_bytes() == server.files["ahri"]
+
+
+def test_gives_up_after_the_retry_budget(server: StandIn, tmp_path: Path):
+    server.files = {"ahri": payload("Ahri")}
+    server.failures = {"ahri": [500, 502, 504]}
+    with fetcher(server, tmp_path, retries=2) as bins:
+        failures = bins.prefetch(["ahri"])
+    assert isinstance(failures["ahri"], rp.FetchError)
+    assert "after 3 attempts" in str(failures["ahri"])
+    assert server.count("ahri") == 3
+    assert not (tmp_path / "ahri.bin.json").exists()
+
+
+def test_client_errors_are_not_retried(server: StandIn, tmp_path: Path):
+    with fetcher(server, tmp_path, retries=3) as bins:
+        failures = bins.prefetch(["nobody"])
+    assert str(failures["nobody"]).startswith("HTTP 404")
+    assert server.count("nobody") == 1
+
+
+def test_revalidation_sends_validators_and_honours_304(server: StandIn, tmp_path: Path):
+    server.files = {"ahri": payload("Ahri")}
+    server.etags = {"ahri": '"v1"'}
+    with fetcher(server, tmp_path) as bins:
+        assert bins.prefetch(["ahri"]) == {}
+    cached = tmp_path / "ahri.bin.json"
+    first_mtime = cached.stat().st_mtime_ns
+    assert server.requests[-1]["if_none_match"] is None
+
+    with fetcher(server, tmp_path, patch="1.1") as bins:
+        assert not bins.is_current("ahri")
+        assert bins.prefetch(["ahri"]) == {}
+        assert bins.is_current("ahri")
+    assert server.requests[-1]["if_none_match"] == '"v1"'
+    assert server.requests[-1]["if_modified_since"] == "Tue, 01 Jul 2025 00:00:00 GMT"
+    assert cached.stat().st_mtime_ns == first_mtime
+
+    with fetcher(server, tmp_path) as bins:
+        assert bins.refresh() == {"checked": 1, "changed": 0, "unchanged": 1, "failed": 0}
+        server.files["ahri"] = payload("Ahri", 2)
+        server.etags["ahri"] = '"v2"'
+        assert bins.refresh(["ahri"]) == {"checked": 1, "changed": 1, "unchanged": 0, "failed": 0}
+    assert cached.read_bytes() == payload("Ahri", 2)
+    manifest = json.loads((tmp_path / rp.CACHE_MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert manifest["entries"]["ahri"]["etag"] == '"v2"'
+
+
+def test_max_inflight_caps_concurrency_and_reuses_connections(server: StandIn, tmp_path: Path):
+    aliases = [f"champ{idx}" for idx in range(12)]
+    server.files = {alias: payload(alias) for alias in aliases}
+    server.delay = 0.05
+    with fetcher(server, tmp_path, max_inflight=3) as bins:
+        assert bins.prefetch(aliases) == {}
+    assert len(server.requests) == len(aliases)
+    assert 2 <= server.peak <= 3
+    assert len(server.clients) <= 3
+
+
+def test_failed_downloads_never_replace_the_cached_file(server: StandIn, tmp_path: Path, monkeypatch):
+    cached = tmp_path / "ahri.bin.json"
+    server.files = {"ahri": payload("Ahri")}
+    with fetcher(server, tmp_path) as bins:
+        assert bins.prefetch(["ahri"]) == {}
+    original = cached.read_bytes()
+
+    server.files["ahri"] = payload("Ahri", 2)
+    server.truncated = {"ahri"}
+    with fetcher(server, tmp_path, patch="1.1", retries=1) as bins:
+        assert bins.prefetch(["ahri"]) == {}
+        assert not bins.is_current("ahri")
+    assert server.count("ahri") == 3
+    assert cached.read_bytes() == original
+    assert leftovers(tmp_path) == []
+
+    server.truncated = set()
+    with monkeypatch.context() as patch:
+        def interrupted(src, dst):
+            raise OSError("disk full")
+
+        patch.setattr(os, "replace", interrupted)
+        with fetcher(server, tmp_path, patch="1.1", retries=0) as bins:
+            assert bins.prefetch(["ahri"]) == {}
+            assert not bins.is_current("ahri")
+    assert cached.read_bytes() == original
+    assert leftovers(tmp_path) == []
+
+    with fetcher(server, tmp_path, patch="1.1", retries=0) as bins:
+        assert bins.prefetch(["ahri"]) == {}
+        assert bins.is_current("ahri")
+    assert cached.read_bytes() == payload("Ahri", 2)
+    assert leftovers(tmp_path) == []
@@ -0,0 +1,213 @@
+"""AbilityResolver calculations: rank vectors, part types and the calculation graph."""
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterator, Optional, Tuple
+
+import pytest
+
+import resolve_placeholders as rp
+
+RANK_LIST = re.compile(r"-?\d+(?:\.\d+)?(?:/-?\d+(?:\.\d+)?)+")
+DATA_VALUES = {
+    "BaseDamage": [0, 10, 20, 30, 40, 50, 60],
+    "APRatio": [0.5] * 7,
+    "Stacks": [0, 1, 2, 3, 4, 5, 6],
+}
+
+
+def number(value: float) -> Dict[str, object]:
+    return {"__type": "NumberCalculationPart", "mNumber": value}
+
+
+def named(name: str) -> Dict[str, object]:
+    return {"__type": "NamedDataValueCalculationPart", "mDataValue": name}
+
+
+def formula(*parts: Dict[str, object], **fields: object) -> Dict[str, object]:
+    return {"__type": "GameCalculation", "mFormulaParts": list(parts), **fields}
+
+
+def make_ability(calculations: Dict[str, Dict[str, object]], partype: str = "Mana") -> rp.AbilityResolver:
+    """A one-spell champion (maxrank 5) whose Q carries DATA_VALUES and the given calculations."""
+    spell = {
+        "mSpell": {
+            "DataValues": [{"mName": name, "mValues": values} for name, values in DATA_VALUES.items()],
+            "mSpellCalculations": calculations,
+        }
+    }
+    meta = {
+        "id": "Test",
+        "spells": [{"id": "TestQ", "maxrank": 5, "effect": [None, [1, 2, 3, 4, 5]], "effectBurn": [None, "1/2/3/4/5"]}],
+        "stats": {"hp": 600},
+    }
+    champion = rp.ChampionResolver("Test", meta, {"Characters/Test/Spells/TestQ": spell}, {"partype": partype})
+    return champion.ability_at(0)
+
+
+def render(part: Dict[str, object], **fields: object) -> str:
+    return make_ability({"calc": formula(part, **fields)}).calculation("calc").to_string()
+
+
+def spell_slots(corpus) -> Iterator[Tuple[str, rp.ChampionResolver, int, rp.AbilityResolver]]:
+    available = rp.available_champions(corpus.meta, corpus.aliases, corpus.store, {})
+    for name, champion in rp.iter_champions(available, corpus.store, corpus.texts["en"]):
+        for idx in range(len(champion.meta.get("spells") or [])):
+            ability = champion.ability_at(idx)
+            if ability is not None and ability.maxrank:
+                yield name, champion, idx, ability
+
+
+def test_values_have_one_entry_per_rank(corpus):
+    checked = 0
+    for name, _, _, ability in spell_slots(corpus):
+        for key, values in ability.data_values.items():
+            assert len(values) <= ability.maxrank, f"{name} {ability.name} {key}"
+        for key in ability.calculations:
+            try:
+                value = ability.calculation(key)
+            except Exception:  # noqa: BLE001
+                continue
+            if not value.by_level:
+                assert value.length() in (1, ability.maxrank), f"{name} {ability.name} {key}: {value!r}"
+                checked += 1
+    assert checked > 500
+
+
+def test_rendered_ranks_match_maxrank(corpus):
+    rendered = 0
+    for name, champion, idx, ability in spell_slots(corpus):
+        spell = corpus.texts["en"][name]["spells"][idx]
+        for field in ("tooltip", "description"):
+            for match in rp.PLACEHOLDER_PATTERN.finditer(spell.get(field) or ""):
+                placeholder = match.group(1).strip()
+                target = ability
+                if placeholder.lower().startswith("spell."):
+                    reference = placeholder.split(":", 1)[0].split(".", 1)[1]
+                    target = champion.abilities.get(rp.to_camel_case(reference).lower()) or champion.ability(reference.lower())
+                    if target is None or not target.maxrank:
+                        continue
+                try:
+                    text = rp.resolve_placeholder(placeholder, "en", champion, ability)
+                except Exception:  # noqa: BLE001
+                    continue
+                for ranks in RANK_LIST.findall(text):
+                    assert ranks.count("/") + 1 == target.maxrank, f"{name} {ability.name} {placeholder}: {text}"
+                    rendered += 1
+    assert rendered > 500
+
+
+@pytest.mark.parametrize("part, expected", [
+    (named("BaseDamage"), "10/20/30/40/50"),
+    ({"__type": "StatByNamedDataValueCalculationPart", "mDataValue": "APRatio"}, "0 (+0.5 AP)"),
+    (number(7), "7"),
+    ({"__type": "ProductOfSubPartsCalculationPart", "mPart1": named("BaseDamage"), "mPart2": number(2)}, "20/40/60/80/100"),
+    ({"__type": "ProductOfSubPartsCalculationPart", "mPart1": number(1),
+      "mPart2": {"__type": "StatByCoefficientCalculationPart", "mStat": 2, "mCoefficient": 1.2}}, "0 (+1.2 total AD)"),
+    ({"__type": "SumOfSubPartsCalculationPart", "mSubparts": [named("BaseDamage"), number(5)]}, "15/25/35/45/55"),
+    ({"__type": "StatByCoefficientCalculationPart", "mCoefficient": 0.3}, "0 (+0.3 AP)"),
+    ({"__type": "StatByCoefficientCalculationPart", "mStat": 12, "mStatFormula": 2, "mCoefficient": 0.1}, "0 (+0.1 bonus Health)"),
+    ({"__type": "StatBySubPartCalculationPart", "mStat": 2, "mStatFormula": 2, "mSubpart": named("BaseDamage")},
+     "0 (+10/20/30/40/50 bonus AD)"),
+    ({"__type": "EffectValueCalculationPart", "mEffectIndex": 1}, "1/2/3/4/5"),
+    ({"__type": "ByCharLevelBreakpointsCalculationPart", "mLevel1Value": 10, "mInitialBonusPerLevel": 1,
+      "mBreakpoints": [{"mLevel": 10, "mAdditionalBonusAtThisLevel": 5, "mBonusPerLevelAtAndAfter": 2}]}, "10–41"),
+    ({"__type": "ByCharLevelInterpolationCalculationPart", "mStartValue": 20, "mEndValue": 105}, "20–105"),
+    ({"__type": "ByCharLevelFormulaCalculationPart", "mValues": list(range(1, 25))}, "1–18"),
+    ({"__type": "ClampSubPartsCalculationPart", "mSubparts": [named("BaseDamage")], "mFloor": 20, "mCeiling": 40},
+     "20/20/30/40/40"),
+    ({"__type": "BuffCounterByCoefficientCalculationPart", "mCoefficient": 3}, "0 (+3 per stack)"),
+    ({"__type": "BuffCounterByNamedDataValueCalculationPart", "mDataValue": "Stacks"}, "0 (+1/2/3/4/5 per stack)"),
+    ({"__type": "AbilityResourceByCoefficientCalculationPart", "mCoefficient": 0.04}, "0 (+0.04 max Mana)"),
+])
+def test_part_types(part: Dict[str, object], expected: str):
+    assert render(part) == expected
+
+
+@pytest.mark.parametrize("part, error", [
+    ({"__type": "StatByCoefficientCalculationPart", "mStat": 99, "mCoefficient": 1}, rp.SkipPlaceholder),
+    ({"__type": "StatBySubPartCalculationPart", "mStat": 8, "mSubpart": number(1)}, rp.SkipPlaceholder),
+    ({"__type": "StatBySubPartCalculationPart", "mStat": 9, "mSubpart": named("BaseDamage")}, rp.SkipPlaceholder),
+    ({"__type": "StatBySubPartCalculationPart", "mStat": 2,
+      "mSubpart": {"__type": "StatByCoefficientCalculationPart", "mCoefficient": 1}}, ValueError),
+    ({"__type": "ProductOfSubPartsCalculationPart",
+      "mPart1": {"__type": "StatByCoefficientCalculationPart", "mStat": 12, "mCoefficient": 1},
+      "mPart2": {"__type": "StatByCoefficientCalculationPart", "mStat": 14, "mCoefficient": 1}}, ValueError),
+    ({"__type": "EffectValueCalculationPart", "mEffectIndex": 4}, KeyError),
+    ({"__type": "ByCharLevelFormulaCalculationPart", "mValues": []}, ValueError),
+    ({"__type": "ClampSubPartsCalculationPart", "mSubparts": [
+        {"__type": "StatByCoefficientCalculationPart", "mCoefficient": 1}], "mCeiling": 1}, ValueError),
+    ({"__type": "SumOfSubPartsCalculationPart", "mSubparts": [
+        named("BaseDamage"), {"__type": "ByCharLevelInterpolationCalculationPart", "mEndValue": 1}]}, ValueError),
+    ({"__type": "SomethingNewCalculationPart"}, ValueError),
+])
+def test_part_errors(part: Dict[str, object], error: type):
+    with pytest.raises(error):
+        render(part)
+
+
+def test_game_calculation_variants():
+    ability = make_ability({
+        "base": formula(named("BaseDamage")),
+        "Modified": {"__type": "GameCalculationModified", "mModifiedGameCalculation": "Base", "mMultiplier": number(1.5)},
+        "conditional": {"__type": "GameCalculationConditional", "mDefaultGameCalculation": "modified",
+                        "mConditionalGameCalculation": "missing"},
+        "perrank": {"__type": "GameCalculationModified", "mModifiedGameCalculation": "base",
+                    "mMultiplier": named("Stacks")},
+        "multiplied": formula(named("BaseDamage"), mMultiplier=number(0.5)),
+        "percent": formula(named("APRatio"), mDisplayAsPercent=True),
+        "ofpercent": {"__type": "GameCalculationModified", "mModifiedGameCalculation": "percent"},
+    })
+    assert ability.calculation("modified").to_string() == "15/30/45/60/75"
+    assert ability.calculation("conditional").to_string() == "15/30/45/60/75"
+    assert ability.calculation("perrank").to_string() == "10/40/90/160/250"
+    assert ability.calculation("multiplied").to_string() == "5/10/15/20/25"
+    assert ability.get_value("Modified").to_string() == "15/30/45/60/75"
+    for key in ("percent", "ofpercent"):
+        with pytest.raises(rp.SkipPlaceholder, match="Percent"):
+            ability.calculation(key)
+
+
+@pytest.mark.parametrize("calculations, key", [
+    ({"loop": {"__type": "GameCalculationModified", "mModifiedGameCalculation": "loop"}}, "loop"),
+    ({"a": {"__type": "GameCalculationModified", "mModifiedGameCalculation": "b"},
+      "b": {"__type": "GameCalculationConditional", "mDefaultGameCalculation": "c"},
+      "c": formula(named("a"))}, "a"),
+    ({"a": formula(named("BaseDamage"), mMultiplier=named("b")),
+      "b": formula(named("a"))}, "b"),
+])
+def test_cycles_are_detected(calculations: Dict[str, Dict[str, object]], key: str):
+    ability = make_ability(calculations)
+    with pytest.raises(ValueError, match="Calculation cycle"):
+        ability.calculation(key)
+    for other in calculations:
+        with pytest.raises(ValueError, match="Calculation cycle"):
+            ability.calculation(other)
+    assert not ability._pending
+
+
+def test_each_calculation_is_evaluated_once(monkeypatch):
+    ability = make_ability({
+        "base": formula(named("BaseDamage")),
+        "double": {"__type": "GameCalculationModified", "mModifiedGameCalculation": "base", "mMultiplier": number(2)},
+        "triple": {"__type": "GameCalculationModified", "mModifiedGameCalculation": "base", "mMultiplier": number(3)},
+        "broken": formula({"__type": "SomethingNewCalculationPart"}),
+    })
+    calls: Dict[Optional[str], int] = {}
+    evaluate = rp.AbilityResolver._evaluate_game_calculation
+
+    def counting(self, calc):
+        kind = calc.get("__type")
+        calls[kind] = calls.get(kind, 0) + 1
+        return evaluate(self, calc)
+
+    monkeypatch.setattr(rp.AbilityResolver, "_evaluate_game_calculation", counting)
+    first = ability.calculation("base")
+    for key in ("double", "triple", "double", "base"):
+        ability.calculation(key)
+    assert ability.calculation("base") is first
+    assert calls == {"GameCalculation": 1, "GameCalculationModified": 2}
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Unsupported calculation part"):
+            ability.calculation("broken")
+    assert calls["GameCalculation"] == 2
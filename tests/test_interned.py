@@ -0,0 +1,140 @@
+"""The string-table text format: intern_strings, its Python decoders and the JS decoder written with it."""
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+from collections import Counter
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+import resolve_placeholders as rp
+
+SYNTHETIC_LOCALE = "xx"
+SYNTHETIC = {
+    "Numbers": {
+        "mixed": [1, 1.0, True, False, None, "1", "1", 0, 0.0, 2.5, "", ""],
+        "nested": {"one": 1, "true": True, "float": 1.0, "none": None, "big": 2 ** 40},
+        "empty": [[], {}, ""],
+    },
+    "Strings": {
+        "repeated": ["1", "True", "null", "once", "twice", "twice"],
+        "unicode": ["é\u2028\"'\\</script>", "é\u2028\"'\\</script>", "\U0001f600"],
+    },
+    "Empty": {},
+}
+
+# Loads one file the way the page does and reports what script.js would see.
+HARNESS = """
+const fs = require("fs");
+const vm = require("vm");
+const [compactPath, plainPath, name] = process.argv.slice(2);
+const load = (path) => {
+  const window = {};
+  vm.runInNewContext(fs.readFileSync(path, "utf8"), { window });
+  return window;
+};
+const texts = load(compactPath)[name];
+const keys = Object.keys(texts);
+const first = keys.map((key) => texts[key]);
+process.stdout.write(JSON.stringify({
+  keys,
+  cached: keys.every((key, idx) => texts[key] === first[idx]),
+  compact: JSON.stringify(texts),
+  plain: JSON.stringify(load(plainPath)[name]),
+}));
+"""
+
+
+def locale_data() -> Dict[str, Dict[str, object]]:
+    return {
+        locale: rp.load_js_object(path, rp.text_var_name(locale))[0]
+        for locale, path in rp.discover_locales().items()
+    }
+
+
+@pytest.fixture(scope="module", params=["synthetic", *rp.discover_locales()])
+def case(request):
+    """(locale, data, plain file) for the synthetic tree and each committed locale."""
+    if request.param == "synthetic":
+        return SYNTHETIC_LOCALE, SYNTHETIC, None
+    return request.param, locale_data()[request.param], rp.discover_locales()[request.param]
+
+
+@pytest.mark.parametrize("left, right, expected", [
+    (1, 1, True),
+    (1, 1.0, False),
+    (1, True, False),
+    (0, False, False),
+    ("1", 1, False),
+    (None, None, True),
+    ([1, [True]], [1, [True]], True),
+    ([1, [True]], [1, [1]], False),
+    ({"a": 1.0}, {"a": 1}, False),
+    ({"a": 1}, {"a": 1, "b": 2}, False),
+    ([1], [1, 1], False),
+])
+def test_same_json(left, right, expected):
+    assert rp.same_json(left, right) is expected
+
+
+def test_round_trip_keeps_exact_types(case):
+    _, data, _ = case
+    table, refs = rp.intern_strings(data)
+    assert rp.same_json(rp.expand_interned(table, refs), data)
+    decoded = rp.InternedText(table, refs)
+    assert list(decoded) == list(data)
+    assert all(rp.same_json(decoded[name], entry) for name, entry in data.items())
+
+    literals = [value for value in rp._scalars(refs) if type(value) is not int]
+    assert all(type(value) is str for value in literals)
+    counts = Counter((type(value), value) for value in rp._scalars(data))
+    assert all(counts[str, value] == 1 for value in literals)
+    assert len(table) == len({(type(value), value) for value in table})
+
+
+def test_written_file_loads_back(case, tmp_path: Path):
+    locale, data, _ = case
+    stats = rp.write_interned(locale, data, tmp_path)
+    path = tmp_path / f"champion_text_{locale}.js"
+    assert stats["bytes"] == path.stat().st_size
+    loaded = rp.InternedText.load(path, locale)
+    assert list(loaded) == list(data)
+    assert all(rp.same_json(loaded[name], entry) for name, entry in data.items())
+
+
+def test_type_drift_is_rejected(monkeypatch, tmp_path: Path):
+    expand = rp.expand_interned
+
+    def drifting(table, value):
+        value = expand(table, value)
+        return [int(item) if type(item) is bool else item for item in value] if isinstance(value, list) else value
+
+    monkeypatch.setattr(rp, "expand_interned", drifting)
+    with pytest.raises(ValueError, match="round-trip"):
+        rp.write_interned(SYNTHETIC_LOCALE, {"A": [True, 1.0]}, tmp_path)
+    assert not (tmp_path / f"champion_text_{SYNTHETIC_LOCALE}.js").exists()
+
+
+def test_js_decoder_matches_plain_file(case, tmp_path: Path):
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node is not installed")
+    locale, data, plain = case
+    var_name = rp.text_var_name(locale)
+    if plain is None:
+        plain = tmp_path / "plain.js"
+        plain.write_text(f"window.{var_name} = {json.dumps(data, ensure_ascii=False)};\n", encoding="utf-8")
+    rp.write_interned(locale, data, tmp_path / "compact")
+    harness = tmp_path / "harness.js"
+    harness.write_text(HARNESS, encoding="utf-8")
+    completed = subprocess.run(
+        [node, str(harness), str(tmp_path / "compact" / f"champion_text_{locale}.js"), str(plain), var_name],
+        capture_output=True, check=True, timeout=120,
+    )
+    result = json.loads(completed.stdout.decode("utf-8"))
+    assert result["keys"] == list(data)
+    assert result["cached"]
+    assert result["compact"] == result["plain"]
@@ -0,0 +1,67 @@
+"""resolve_parallel and its worker processes: read-only store access and results equal to a serial run."""
+from __future__ import annotations
+
+import copy
+import hashlib
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import resolve_placeholders as rp
+
+ROSTER = ("Ahri", "Jax", "Lulu", "Viego", "Zac")
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_read_only_store_rejects_writes(tmp_path: Path):
+    path = tmp_path / "spells.sqlite"
+    with rp.SpellStore(path, rp.CACHE_DIR) as store:
+        store.sync([rp.normalize_alias("Ahri")])
+        expected = store.load("ahri")
+    before = file_digest(path)
+    with rp.SpellStore(path, rp.CACHE_DIR, read_only=True) as reader:
+        assert reader.load("ahri") == expected
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            reader.sync(["jax"])
+    assert file_digest(path) == before
+    with pytest.raises(sqlite3.OperationalError):
+        rp.SpellStore(tmp_path / "missing.sqlite", read_only=True)
+    assert not (tmp_path / "missing.sqlite").exists()
+
+
+def test_worker_store_is_read_only_and_closed(tmp_path: Path):
+    path = tmp_path / "spells.sqlite"
+    rp.SpellStore(path).close()
+    rp._init_worker(str(path))
+    store = rp._worker_store
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            store.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', 'x')")
+    finally:
+        rp._close_worker()
+    assert rp._worker_store is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.conn.execute("SELECT 1")
+
+
+def test_parallel_run_leaves_store_untouched(corpus, tmp_path: Path):
+    path = tmp_path / "spells.sqlite"
+    roster = [(name, corpus.meta[name], corpus.aliases[name]) for name in ROSTER]
+    texts = {locale: {name: data[name] for name in ROSTER} for locale, data in corpus.texts.items()}
+    with rp.SpellStore(path, rp.CACHE_DIR) as store:
+        store.sync(alias for _, _, alias in roster)
+        before = file_digest(path)
+
+        parallel = [(locale, copy.deepcopy(data)) for locale, data in texts.items()]
+        rp.resolve_parallel(2, store, roster, parallel, rp.RunMetrics())
+        assert file_digest(path) == before
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["spells.sqlite"]
+
+        serial = [(locale, copy.deepcopy(data)) for locale, data in texts.items()]
+        for _, champion in rp.iter_champions(roster, store, texts["en"]):
+            rp.resolve_champion(champion, serial, rp.RunMetrics())
+    assert dict(parallel) == dict(serial)
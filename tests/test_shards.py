@@ -0,0 +1,73 @@
+"""write_shards: content-hashed per-champion files and their compressed siblings."""
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+import resolve_placeholders as rp
+
+DATA = {
+    "Ahri": {"name": "Ahri", "spells": [{"tooltip": "Deals 40/65/90/115/140 magic damage."}]},
+    "Jax": {"name": "Jax", "spells": [{"tooltip": "Leaps to a target."}]},
+}
+
+
+@pytest.fixture
+def compressions(monkeypatch) -> Dict[str, int]:
+    calls = {"gzip": 0, "brotli": 0}
+
+    def counting(kind, compress):
+        def wrapper(*args, **kwargs):
+            calls[kind] += 1
+            return compress(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(rp.gzip, "compress", counting("gzip", gzip.compress))
+    if rp.brotli is not None:
+        monkeypatch.setattr(rp.brotli, "compress", counting("brotli", rp.brotli.compress))
+    return calls
+
+
+def variants_per_champion() -> int:
+    return 3 if rp.brotli is not None else 2
+
+
+def test_unchanged_champions_are_not_recompressed(compressions, tmp_path: Path):
+    first = rp.write_shards("en", DATA, tmp_path)
+    assert first == {"written": 2 * variants_per_champion(), "kept": 0, "removed": 0}
+    assert compressions["gzip"] == 2
+    manifest_path = tmp_path / "en" / "manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    for entry in manifest["champions"].values():
+        shard = tmp_path / "en" / entry["file"]
+        assert gzip.decompress((tmp_path / "en" / f"{entry['file']}.gz").read_bytes()) == shard.read_bytes()
+        assert entry["gzip"] == (tmp_path / "en" / f"{entry['file']}.gz").stat().st_size
+
+    compressions.update(gzip=0, brotli=0)
+    second = rp.write_shards("en", DATA, tmp_path)
+    assert second == {"written": 0, "kept": 2 * variants_per_champion(), "removed": 0}
+    assert compressions == {"gzip": 0, "brotli": 0}
+    assert json.loads(manifest_path.read_text(encoding="utf-8")) == manifest
+
+    changed = {**DATA, "Jax": {"name": "Jax", "spells": [{"tooltip": "Counter Strike."}]}}
+    third = rp.write_shards("en", changed, tmp_path)
+    per = variants_per_champion()
+    assert third == {"written": per, "kept": per, "removed": per}
+    assert compressions == {"gzip": 1, "brotli": 1 if rp.brotli is not None else 0}
+    assert len([path for path in (tmp_path / "en").iterdir() if path.name != "manifest.json"]) == 2 * per
+
+
+def test_missing_sibling_is_rewritten(compressions, tmp_path: Path):
+    rp.write_shards("en", DATA, tmp_path)
+    manifest = json.loads((tmp_path / "en" / "manifest.json").read_text(encoding="utf-8"))
+    gz = tmp_path / "en" / f"{manifest['champions']['Ahri']['file']}.gz"
+    gz.unlink()
+    compressions.update(gzip=0, brotli=0)
+    summary = rp.write_shards("en", DATA, tmp_path)
+    assert summary["written"] == 1
+    assert compressions == {"gzip": 1, "brotli": 0}
+    assert gz.stat().st_size == manifest["champions"]["Ahri"]["gzip"]
@@ -0,0 +1,34 @@
+"""ChampionResolver.spell_objects: listing the spell objects of a bin."""
+from __future__ import annotations
+
+import resolve_placeholders as rp
+
+
+def test_spell_objects_lists_only_spells():
+    spell = {"mSpell": {"DataValues": []}}
+    bin_data = {
+        "Characters/Test/Spells/TestQ": spell,
+        "Characters/Test/Spells/TestQMissile": {"mSpell": {"mCastTime": 0.25}},
+        "Characters/Test/Spells/TestBuff": {"mBuffName": "x"},
+        "Characters/Test/Spells/testq": {"mSpell": {"DataValues": [1]}},
+        "Characters/Test/CharacterRecords/Root": {"mSpellNames": ["TestQ"]},
+        "NoPath": {"mSpell": {}},
+        "Characters/Test/Spells/TestEmpty": {"mSpell": None},
+    }
+    champion = rp.ChampionResolver("Test", {"id": "Test", "spells": [{"id": "TestQ"}]}, bin_data, {})
+    spells = champion.spell_objects()
+    assert list(spells) == ["testq", "testqmissile"]
+    assert spells["testq"] is spell
+    assert champion.ability_at(0).spell_data is spell
+
+
+def test_spell_objects_cover_every_ability(corpus):
+    meta = corpus.meta["Ahri"]
+    champion = rp.ChampionResolver("Ahri", meta, corpus.store.load(corpus.aliases["Ahri"]), corpus.texts["en"]["Ahri"])
+    spells = champion.spell_objects()
+    assert all(isinstance(value.get("mSpell"), dict) for value in spells.values())
+    assert {spell["id"].lower() for spell in meta["spells"]} <= set(spells)
+    assert {id(ability.spell_data) for ability in champion.abilities.values()} <= {id(value) for value in spells.values()}
+    assert len(spells) > len(meta["spells"])
+    for key in spells:
+        assert champion.ability(key) is not None
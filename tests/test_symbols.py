@@ -0,0 +1,174 @@
+"""AbilityResolver.get_value: the lazily filled symbol table against the lookup chain it replaced."""
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterator, List, Set, Tuple
+
+import pytest
+
+import resolve_placeholders as rp
+
+SPELL_REFERENCE = re.compile(r"spell\.", re.IGNORECASE)
+FIELD_REFERENCE = re.compile(r"f\d+(?:\.\d+)?", re.IGNORECASE)
+
+
+def legacy_get_value(self: rp.AbilityResolver, name: str) -> rp.Value:
+    """get_value as it was before the symbol table: the whole ladder on every call."""
+    name = name.strip()
+    name_lower = name.lower()
+
+    if name_lower in rp.SPECIAL_EMPTY:
+        return rp.Value.from_scalar(0.0)
+
+    effect_match = re.match(r"(?:e|effect)(\d+)(?:amount)?(nl)?", name_lower)
+    if effect_match:
+        index = int(effect_match.group(1))
+        values = self._get_effect_values(index)
+        if effect_match.group(2):
+            values = rp.shift_next(values)
+        return rp.Value.from_numbers(values)
+
+    if name_lower == "cooldown":
+        return rp.Value.from_numbers(self.cooldown)
+    if name_lower == "cooldownnl":
+        return rp.Value.from_numbers(rp.shift_next(self.cooldown))
+    if name_lower == "cost":
+        return rp.Value.from_numbers(self.cost)
+    if name_lower == "costnl":
+        return rp.Value.from_numbers(rp.shift_next(self.cost))
+    if name_lower == "range":
+        return rp.Value.from_numbers(self.range)
+    if name_lower == "rangenl":
+        return rp.Value.from_numbers(rp.shift_next(self.range))
+
+    if name_lower in self.data_values:
+        return rp.Value.from_numbers(self.data_values[name_lower])
+
+    camel = rp.to_camel_case(name_lower)
+    if camel.lower() in self.data_values:
+        return rp.Value.from_numbers(self.data_values[camel.lower()])
+
+    if name_lower in self.calculations:
+        return self.calculation(name_lower)
+    if camel.lower() in self.calculations:
+        return self.calculation(camel.lower())
+
+    stats = self.champion.stats
+    if camel in stats:
+        return rp.Value.from_numbers([float(stats[camel])])
+
+    raise KeyError(f"Unknown placeholder '{name}' for ability {self.name}")
+
+
+def outcome(action) -> Tuple[str, str]:
+    try:
+        result = action()
+    except Exception as err:  # noqa: BLE001
+        return type(err).__name__, str(err)
+    return "ok", result if isinstance(result, str) else result.to_string()
+
+
+def placeholders(value: object) -> Iterator[str]:
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from placeholders(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from placeholders(item)
+    elif isinstance(value, str):
+        for match in rp.PLACEHOLDER_PATTERN.finditer(value):
+            yield match.group(1).strip()
+
+
+def champions(corpus) -> Iterator[Tuple[str, rp.ChampionResolver]]:
+    available = rp.available_champions(corpus.meta, corpus.aliases, corpus.store, {})
+    return rp.iter_champions(available, corpus.store, corpus.texts["en"])
+
+
+def spellings(champion: rp.ChampionResolver, ability: rp.AbilityResolver, texts: List[object]) -> Set[str]:
+    names: Set[str] = set()
+    for text in texts:
+        for name in placeholders(text):
+            names.update(rp.TOKEN_PATTERN.findall(name.split(":", 1)[-1]))
+    names.update(ability.data_values)
+    names.update(ability.calculations)
+    for idx in range(12):
+        names.update({f"e{idx}", f"E{idx}NL", f"effect{idx}amount", f"Effect{idx}AmountNL", f"f{idx}"})
+    for field in ("cooldown", "cost", "range"):
+        names.update({field, field.upper(), f"{field}NL", f"{field}nl"})
+    names.update(champion.stats)
+    names.update(stat.lower() for stat in champion.stats)
+    names.update(rp.SPECIAL_EMPTY)
+    names.update(name.upper() for name in list(names))
+    names.update(f" {name} " for name in list(names)[:20])
+    names.update({"", "unknownthing", "base_damage", "Base Damage"})
+    return names
+
+
+def test_every_spelling_matches_lookup_chain(corpus, monkeypatch):
+    checked = 0
+    for name, champion in champions(corpus):
+        texts = [data.get(name) for data in corpus.texts.values()]
+        legacy_champion = rp.ChampionResolver(name, champion.meta, champion.bin_data, champion.en_entry)
+        for key, ability in champion.abilities.items():
+            legacy_ability = legacy_champion.abilities[key]
+            for spelling in sorted(spellings(champion, ability, texts)):
+                first = outcome(lambda: ability.get_value(spelling))
+                repeat = outcome(lambda: ability.get_value(spelling))
+                with monkeypatch.context() as patch:
+                    patch.setattr(rp.AbilityResolver, "get_value", legacy_get_value)
+                    expected = outcome(lambda: legacy_ability.get_value(spelling))
+                assert first == expected, f"{name} {key} {spelling!r}"
+                assert repeat == expected, f"{name} {key} {spelling!r} (repeated)"
+                checked += 1
+    assert checked > 100000
+
+
+def test_spell_and_field_references_match_lookup_chain(corpus, monkeypatch):
+    references: Dict[str, Set[str]] = {}
+    for locale, data in corpus.texts.items():
+        for name, entry in data.items():
+            for placeholder in placeholders(entry):
+                if SPELL_REFERENCE.match(placeholder) or FIELD_REFERENCE.fullmatch(placeholder):
+                    references.setdefault(name, set()).add(placeholder)
+    assert any(SPELL_REFERENCE.match(p) for found in references.values() for p in found)
+    assert any(FIELD_REFERENCE.fullmatch(p) for found in references.values() for p in found)
+
+    compared = 0
+    for name, champion in champions(corpus):
+        legacy_champion = rp.ChampionResolver(name, champion.meta, champion.bin_data, champion.en_entry)
+        for placeholder in sorted(references.get(name, ())):
+            for key in sorted(champion.abilities):
+                current = outcome(lambda: rp.resolve_placeholder(placeholder, "en", champion, champion.abilities[key]))
+                with monkeypatch.context() as patch:
+                    patch.setattr(rp.AbilityResolver, "get_value", legacy_get_value)
+                    ability = legacy_champion.abilities[key]
+                    expected = outcome(lambda: rp.resolve_placeholder(placeholder, "en", legacy_champion, ability))
+                assert current == expected, f"{name} {key} {placeholder!r}"
+                compared += 1
+    assert compared > 100
+
+
+def test_corpus_resolves_identically_with_lookup_chain(corpus, monkeypatch):
+    metrics = rp.RunMetrics()
+    current = corpus.resolve(metrics)
+    monkeypatch.setattr(rp.AbilityResolver, "get_value", legacy_get_value)
+    legacy_metrics = rp.RunMetrics()
+    legacy = corpus.resolve(legacy_metrics)
+
+    for outcome_name in rp.RunMetrics.OUTCOMES:
+        assert legacy_metrics.counters.get(outcome_name) == metrics.counters.get(outcome_name)
+    for locale, data in current.items():
+        for name, entry in data.items():
+            assert entry == legacy[locale][name], f"{locale} {name}"
+
+
+@pytest.mark.parametrize("spelling", ["BaseDamage", "basedamage", " basedamage ", "BASEDAMAGE"])
+def test_spellings_share_one_symbol(corpus, spelling):
+    champion = rp.ChampionResolver("Ahri", corpus.meta["Ahri"], corpus.store.load(corpus.aliases["Ahri"]),
+                                   corpus.texts["en"]["Ahri"])
+    ability = champion.ability_at(0)
+    value = ability.get_value(spelling)
+    assert ability.symbols[spelling] is value
+    assert ability.get_value(spelling) is value
+    assert value.to_string() == rp.Value.from_numbers(ability.data_values["basedamage"]).to_string()
@@ -0,0 +1,262 @@
+"""build_tag_index: the Python port against the regexes and tag functions in script.js."""
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import pytest
+
+import build_tag_index as tags
+import resolve_placeholders as rp
+
+SCRIPT_PATH = rp.BASE_DIR / "script.js"
+META_PATH = rp.BASE_DIR / "champion_meta.js"
+EN_TEXT_PATH = rp.TRANSLATIONS_DIR / "champion_text_en.js"
+JS_FIRST = "  function parseAbilityTagsFromText("
+JS_NEXT = "  function mapRoleTagsLowercase("
+
+# Each case exercises one alternative of a script.js pattern, or a place where
+# Python's re and a JS regex without the "u" flag disagree by default.
+TEXT_CASES = [
+    ("", set()),
+    (None, set()),
+    ("Ahri dashes forward", {"mobility"}),
+    ("dashing through", set()),
+    ("Blinks to the target", {"mobility"}),
+    ("becomes Untargetable", {"mobility"}),
+    ("leaps, then teleports", {"mobility"}),
+    ("STUNNED for 1 second", {"stun"}),
+    ("stuns the target", set()),
+    ("éstun", {"stun"}),
+    ("stunñ", {"stun"}),
+    ("stun_now", set()),
+    ("Rooted in place", {"root"}),
+    ("immobilize enemies", {"root"}),
+    ("snares", set()),
+    ("knockup", {"knockup"}),
+    ("Knock Up", {"knockup"}),
+    ("knock\u00a0up", {"knockup"}),
+    ("knock\u2003back", {"knockup"}),
+    ("knock\ufeffup", {"knockup"}),
+    ("knock\u200bup", set()),
+    ("knock\u0085up", set()),
+    ("knocked back", set()),
+    ("pushed back", {"knockup"}),
+    ("knocks enemies Airborne", {"knockup"}),
+    ("Silenced", {"silence"}),
+    ("slowed by 30%", {"slow"}),
+    ("slows", set()),
+    ("grabbed and pulled", {"pull"}),
+    ("drags", {"pull"}),
+    ("Camouflaged", {"stealth"}),
+    ("becomes invisible", {"stealth"}),
+    ("gains bonus Attack Speed", {"attackspeed"}),
+    ("attack  speed", set()),
+    ("Move Speed", {"movespeed"}),
+    ("gain movement speed", {"movespeed"}),
+    ("shielded", {"shield"}),
+    ("shields", set()),
+    ("heals", {"heal"}),
+    ("restores health", {"heal"}),
+    ("healing", set()),
+    ("Omnivamp", {"lifesteal"}),
+    ("spell vamp", {"lifesteal"}),
+    ("{{ vamp }}", {"lifesteal"}),
+    ("{{lifestealtooltip}}", {"lifesteal"}),
+    ("heals for 30% of damage dealt", {"heal", "lifesteal"}),
+    ("heals\nfor damage", {"heal"}),
+    ("heals\u2028for damage", {"heal"}),
+    ("heals\u0085for damage", {"heal", "lifesteal"}),
+    ("healing from damage", {"lifesteal"}),
+    ("healing equal to 30% of damage", {"lifesteal"}),
+    ("heals for a very long time from damage", {"heal"}),
+    ("converts damage dealt as health", {"lifesteal"}),
+    ("восстанавливает 10% от нанесенного урона", {"lifesteal"}),
+    ("ВОССТАНАВЛИВАЕТ процент урона", {"lifesteal"}),
+    ("Dash, stun, slow, shield and heal", {"mobility", "stun", "slow", "shield", "heal"}),
+]
+
+
+def synthetic_details() -> Dict[str, Dict[str, object]]:
+    """Small champion details for the slot rules: leaking vars links, passive health, missing fields."""
+    return {
+        "links": {
+            "spells": [
+                {"name": "Q", "tooltip": "Deals physical damage", "vars": [{"link": "BonusHealth"}]},
+                {"name": "W", "description": "Dashes", "vars": None},
+                {"name": "E", "leveltip": {"label": ["Slow", None, "Cooldown"]}},
+                {"name": "R", "tooltip": "{{ maxhealth }} magic damage", "vars": [{"link": 3}, None]},
+                {"name": "extra", "tooltip": "stun"},
+            ],
+            "passive": {"name": "Heal", "description": "magic damage", "tooltip": "shield"},
+        },
+        "passive_health": {
+            "spells": [{"name": "Q", "tooltip": "{{maxhealth}}"}, {"name": "W", "description": "Stun"}],
+            "passive": {"description": "Gains {{ percenthealth }} Physical Damage"},
+        },
+        "empty": {"spells": [], "passive": {}},
+    }
+
+
+def js_slots(result: Dict[str, Dict[str, object]]) -> Dict[str, Set[str]]:
+    """The sets script.js filters on, in build_tag_index's slot layout (there is no passive-only set)."""
+    tags_data, damage, health = result["tags"], result["damage"], result["health"]
+    slots = {
+        key: set(tags_data["tagsByAbility"][key]) | set(damage["typesByAbility"][key])
+        | ({"scalesHealth"} if health["scalingByAbility"][key] else set())
+        for key in tags.ABILITY_KEYS
+    }
+    slots["ALL"] = set(tags_data["tags"]) | set(damage["types"]) | ({"scalesHealth"} if health["hasScaling"] else set())
+    return slots
+
+
+def python_slots(detail: Dict[str, object]) -> Dict[str, Set[str]]:
+    slots = tags.champion_slot_bits(detail)
+    return {slot: slots[slot] for slot in tags.ABILITY_KEYS + ("ALL",)}
+
+
+def decode_index(index: Dict[str, object]) -> Dict[str, Dict[str, Set[str]]]:
+    width = len(index["slots"])
+    return {
+        champion: {
+            slot: {bit for idx, bit in enumerate(index["bits"]) if index["masks"][c * width + s] >> idx & 1}
+            for s, slot in enumerate(index["slots"])
+        }
+        for c, champion in enumerate(index["champions"])
+    }
+
+
+HARNESS = """
+const fs = require("fs");
+const vm = require("vm");
+const [inputPath, ...scriptPaths] = process.argv.slice(2);
+const window = {};
+for (const path of scriptPaths) vm.runInNewContext(fs.readFileSync(path, "utf8"), { window });
+const RU_LOCALE = "ru_RU";
+const LOCAL_BASE = ".";
+async function loadLanguageFile() {}
+async function fetchJson() { return {}; }
+%s
+const evaluate = (detail) => ({
+  tags: accumulateChampionTags(detail),
+  damage: extractDamageTypesFromDetailEN(detail),
+  health: hasOwnHealthScaling(detail),
+});
+(async () => {
+  const input = JSON.parse(fs.readFileSync(inputPath, "utf8"));
+  const output = { texts: input.texts.map((text) => Array.from(parseAbilityTagsFromText(text))), details: {}, corpus: {} };
+  for (const [name, detail] of Object.entries(input.details)) output.details[name] = evaluate(detail);
+  for (const name of Object.keys(window.LOL_CHAMPIONS_META)) {
+    const detail = await loadChampionDetailByLocale(name, "en_US");
+    if (detail) output.corpus[name] = evaluate(detail);
+  }
+  process.stdout.write(JSON.stringify(output));
+})();
+"""
+
+
+def script_tag_functions() -> str:
+    """parseAbilityTagsFromText through hasOwnHealthScaling, verbatim from script.js."""
+    source = SCRIPT_PATH.read_text(encoding="utf-8")
+    start, end = source.find(JS_FIRST), source.find(JS_NEXT)
+    assert 0 <= start < end, "script.js tag functions moved; update JS_FIRST/JS_NEXT"
+    return source[start:end]
+
+
+@pytest.fixture(scope="module")
+def script_results(tmp_path_factory: pytest.TempPathFactory) -> Dict[str, object]:
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node is not installed")
+    scratch: Path = tmp_path_factory.mktemp("tag_index")
+    harness = scratch / "harness.js"
+    harness.write_text(HARNESS % script_tag_functions(), encoding="utf-8")
+    payload = scratch / "input.json"
+    payload.write_text(json.dumps({
+        "texts": [text for text, _ in TEXT_CASES],
+        "details": synthetic_details(),
+    }), encoding="utf-8")
+    completed = subprocess.run(
+        [node, str(harness), str(payload), str(META_PATH), str(EN_TEXT_PATH)],
+        capture_output=True, check=True, timeout=120,
+    )
+    return json.loads(completed.stdout.decode("utf-8"))
+
+
+@pytest.mark.parametrize("text, expected", TEXT_CASES)
+def test_parse_ability_tags(text: Optional[str], expected: Set[str]):
+    assert tags.parse_ability_tags(text) == expected
+
+
+def test_text_cases_match_script(script_results):
+    for (text, expected), found in zip(TEXT_CASES, script_results["texts"]):
+        assert set(found) == expected, repr(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Deals Magic Damage", {"magic"}),
+    ("physical damage and MAGIC DAMAGE", {"magic", "physical"}),
+    ("magic  damage", set()),
+    ("true damage", set()),
+    (None, set()),
+])
+def test_damage_types(text: Optional[str], expected: Set[str]):
+    assert tags.damage_types(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("{{ maxhealth }}", True),
+    ("{{ MaxHealthRatio }}", True),
+    ("{{ totalpercenthealth }}", True),
+    ("{{maxhealth}}", False),
+    ("{{ health }}", False),
+    ("", False),
+    (None, False),
+])
+def test_health_placeholder(text: Optional[str], expected: bool):
+    assert tags.has_health_placeholder(text) is expected
+
+
+def test_slot_rules():
+    details = synthetic_details()
+    slots = tags.champion_slot_bits(details["links"])
+    assert slots["Q"] == {"physical", "scalesHealth"}
+    # The link set is shared across spells in script.js, so W and E inherit Q's BonusHealth link.
+    assert slots["W"] == {"mobility", "scalesHealth"}
+    assert slots["E"] == {"slow", "scalesHealth"}
+    assert slots["R"] == {"magic", "scalesHealth"}
+    assert slots["P"] == {"heal", "shield", "magic"}
+    assert slots["ALL"] == slots["Q"] | slots["W"] | slots["E"] | slots["R"] | slots["P"]
+
+    slots = tags.champion_slot_bits(details["passive_health"])
+    assert slots["Q"] == slots["R"] == {"scalesHealth"}
+    assert slots["W"] == {"stun", "scalesHealth"}
+    assert slots["P"] == {"physical"}
+    assert tags.champion_slot_bits(details["empty"]) == {slot: set() for slot in tags.SLOTS}
+
+
+def test_slot_rules_match_script(script_results):
+    for name, detail in synthetic_details().items():
+        assert python_slots(detail) == js_slots(script_results["details"][name]), name
+
+
+def test_corpus_matches_script(script_results):
+    meta = rp.load_js_document(META_PATH)["LOL_CHAMPIONS_META"].value
+    en_text = rp.load_js_document(EN_TEXT_PATH)["LOL_CHAMPIONS_TEXT_EN"].value
+    index = tags.build_index(meta, en_text, "test")
+    built = decode_index(index)
+    expected = script_results["corpus"]
+
+    assert len(expected) > 100
+    assert sorted(expected) == index["champions"]
+    mismatches: List[str] = []
+    for name, result in expected.items():
+        found = {slot: built[name][slot] for slot in tags.ABILITY_KEYS + ("ALL",)}
+        if found != js_slots(result):
+            mismatches.append(name)
+    assert not mismatches
+    assert any(built[name]["ALL"] for name in built)
+    assert {bit for name in built for bit in built[name]["ALL"]} == set(tags.BITS)
@@ -0,0 +1,315 @@
+"""Value: equivalence with the list-backed implementation it replaced, broadcasting and immutability."""
+from __future__ import annotations
+
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pytest
+
+import resolve_placeholders as rp
+
+
+def align_lists(a: List[float], b: List[float]) -> Tuple[List[float], List[float]]:
+    length = max(len(a), len(b))
+
+    def expand(values: List[float]) -> List[float]:
+        if not values:
+            return [0.0] * length
+        if len(values) == length:
+            return values
+        if len(values) == 1:
+            return [values[0]] * length
+        return values + [values[-1]] * (length - len(values))
+
+    return expand(a), expand(b)
+
+
+class LegacyValue:
+    """The list-backed Value (align_lists/ensure_length) as it was before the array rewrite.
+
+    The per-level axis and numeric multiplication added since are written in
+    the same list style, so the whole resolver can run on either class.
+    to_string pads a copy: the original padded in place, which is only safe
+    while nothing shares a Value.
+    """
+
+    def __init__(self, terms: Optional[Dict[str, Iterable[float]]] = None, by_level: bool = False):
+        self.terms: Dict[str, List[float]] = {label: [float(x) for x in coeffs] for label, coeffs in (terms or {}).items()}
+        self.by_level = by_level
+
+    @classmethod
+    def from_numbers(cls, numbers: Iterable[float]) -> "LegacyValue":
+        return cls({"": [float(x) for x in numbers]})
+
+    @classmethod
+    def from_scalar(cls, number: float) -> "LegacyValue":
+        return cls({"": [float(number)]})
+
+    @classmethod
+    def from_scaling(cls, coeffs: Iterable[float], label: str) -> "LegacyValue":
+        return cls({label: [float(x) for x in coeffs]})
+
+    @classmethod
+    def from_levels(cls, numbers: Iterable[float]) -> "LegacyValue":
+        return cls({"": [float(x) for x in numbers]}, by_level=True)
+
+    def copy(self) -> "LegacyValue":
+        return LegacyValue({k: v[:] for k, v in self.terms.items()}, self.by_level)
+
+    def ensure_length(self, length: int) -> None:
+        for key, values in list(self.terms.items()):
+            if not values:
+                self.terms[key] = [0.0] * length
+            elif len(values) == length:
+                continue
+            elif len(values) == 1:
+                self.terms[key] = [values[0]] * length
+            else:
+                self.terms[key] = values + [values[-1]] * (length - len(values))
+
+    def _axis(self, other: "LegacyValue") -> bool:
+        if self.by_level == other.by_level:
+            return self.by_level
+        per_rank = other if self.by_level else self
+        if per_rank.length() > 1:
+            raise ValueError("Cannot combine per-rank and per-level values")
+        return True
+
+    def merge(self, other: "LegacyValue") -> "LegacyValue":
+        by_level = self._axis(other)
+        out = self.copy()
+        out.by_level = by_level
+        for desc, coeffs in other.terms.items():
+            if desc in out.terms:
+                a, b = align_lists(out.terms[desc], coeffs)
+                out.terms[desc] = [x + y for x, y in zip(a, b)]
+            else:
+                out.terms[desc] = coeffs[:]
+        return out
+
+    def add(self, other: "LegacyValue") -> "LegacyValue":
+        return self.merge(other)
+
+    def sub(self, other: "LegacyValue") -> "LegacyValue":
+        return self.merge(other.neg())
+
+    def _scaled_by(self, factors: List[float], by_level: bool) -> "LegacyValue":
+        terms = {}
+        for label, coeffs in self.terms.items():
+            a, b = align_lists(coeffs, factors)
+            terms[label] = [x * y for x, y in zip(a, b)]
+        return LegacyValue(terms, by_level)
+
+    def mul(self, other: "LegacyValue") -> "LegacyValue":
+        if other.is_scalar():
+            scalar = other.get_scalar()
+            return LegacyValue({k: [x * scalar for x in v] for k, v in self.terms.items()}, self.by_level)
+        if self.is_scalar():
+            scalar = self.get_scalar()
+            return LegacyValue({k: [x * scalar for x in v] for k, v in other.terms.items()}, other.by_level)
+        if other.is_numeric():
+            return self._scaled_by(other.terms[""], self._axis(other))
+        if self.is_numeric():
+            return other._scaled_by(self.terms[""], self._axis(other))
+        raise ValueError("Multiplication of non-scalar values is not supported")
+
+    def truediv(self, other: "LegacyValue") -> "LegacyValue":
+        if other.is_scalar():
+            scalar = other.get_scalar()
+            return LegacyValue({k: [x / scalar for x in v] for k, v in self.terms.items()}, self.by_level)
+        raise ValueError("Division by non-scalar values is not supported")
+
+    def neg(self) -> "LegacyValue":
+        return LegacyValue({k: [-x for x in v] for k, v in self.terms.items()}, self.by_level)
+
+    def is_scalar(self) -> bool:
+        return self.is_numeric() and len(self.terms[""]) == 1
+
+    def is_numeric(self) -> bool:
+        return set(self.terms) == {""}
+
+    def get_scalar(self) -> float:
+        if not self.is_scalar():
+            raise ValueError("Value is not scalar")
+        return self.terms[""][0]
+
+    def length(self) -> int:
+        length = 0
+        for values in self.terms.values():
+            length = max(length, len(values))
+        return length or 1
+
+    def to_string(self) -> str:
+        length = self.length()
+        padded = self.copy()
+        padded.ensure_length(length)
+        render = rp.level_range if self.by_level else rp.list_to_slash
+        result = render(padded.terms.get("", [0.0] * length))
+        extras: List[str] = []
+        for desc, coeffs in padded.terms.items():
+            if not desc:
+                continue
+            if all(abs(x) < 1e-8 for x in coeffs):
+                continue
+            formatted = render(coeffs)
+            sign = "" if formatted.startswith("-") else "+"
+            extras.append(f"({sign}{formatted} {desc})")
+        if extras:
+            result = f"{result} {' '.join(extras)}".strip()
+        return result.strip()
+
+
+def test_corpus_resolves_identically_with_legacy_value(corpus, monkeypatch):
+    metrics = rp.RunMetrics()
+    current = corpus.resolve(metrics)
+    assert metrics.counters["replaced"] > 10000
+
+    monkeypatch.setattr(rp, "Value", LegacyValue)
+    legacy_metrics = rp.RunMetrics()
+    legacy = corpus.resolve(legacy_metrics)
+
+    for outcome_name in rp.RunMetrics.OUTCOMES:
+        assert legacy_metrics.counters.get(outcome_name) == metrics.counters.get(outcome_name)
+    for locale, data in current.items():
+        for name, entry in data.items():
+            assert entry == legacy[locale][name], f"{locale} {name}"
+
+
+def corpus_vectors(corpus) -> List[List[float]]:
+    vectors = set()
+    champions = rp.available_champions(corpus.meta, corpus.aliases, corpus.store, {})
+    for _, champion in rp.iter_champions(champions, corpus.store, corpus.texts["en"]):
+        for ability in set(champion.abilities.values()):
+            for values in (ability.cooldown, ability.cost, ability.range, *ability.data_values.values()):
+                vectors.add(tuple(values))
+    return [list(values) for values in sorted(vectors)]
+
+
+OPERATIONS = ("add", "sub", "mul", "truediv")
+LABELS = ("AP", "bonus AD", "max Health")
+
+
+def random_operand(rng: random.Random, vectors: List[List[float]], cls) -> object:
+    kind = rng.randrange(5)
+    if kind == 0:
+        return cls.from_scalar(rng.choice((0.5, 2.0, 100.0, -1.0, 3.0)))
+    if kind == 1:
+        return cls.from_scaling(rng.choice(vectors) or [0.1], rng.choice(LABELS))
+    if kind == 2:
+        return cls.from_levels([1.0 + level * 0.5 for level in range(rp.CHAMPION_LEVELS)])
+    return cls.from_numbers(rng.choice(vectors))
+
+
+def outcome(action):
+    try:
+        value = action()
+    except (ValueError, ZeroDivisionError) as err:
+        return type(err).__name__, None
+    return value.to_string(), value.is_scalar()
+
+
+def test_random_operation_chains_match_legacy_value(corpus):
+    vectors = corpus_vectors(corpus)
+    assert len(vectors) > 1000
+    for seed in range(400):
+        # The same seed draws the same operands for both classes.
+        values = {}
+        for cls in (rp.Value, LegacyValue):
+            rng = random.Random(seed)
+            value = cls.from_numbers(rng.choice(vectors))
+            trace = []
+            for _ in range(12):
+                operand = random_operand(rng, vectors, cls)
+                name = rng.choice(OPERATIONS + ("neg",))
+                step = (lambda v=value: v.neg()) if name == "neg" else (lambda v=value, o=operand, n=name: getattr(v, n)(o))
+                result = outcome(step)
+                trace.append(result)
+                if result[1] is not None:
+                    value = step()
+            values[cls] = trace
+        assert values[rp.Value] == values[LegacyValue], f"seed {seed}"
+
+
+def v(*numbers: float) -> rp.Value:
+    return rp.Value.from_numbers(numbers)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (v(1, 2, 3).add(rp.Value.from_scalar(10)), "11/12/13"),
+        (v(1, 2).add(v(10, 20, 30)), "11/22/32"),
+        (rp.Value({"": rp._vector(())}).add(v(1, 2)), "1/2"),
+        (v(10, 20, 30).add(rp.Value.from_scaling([0.5], "AP")), "10/20/30 (+0.5 AP)"),
+        (v(10, 20, 30).add(rp.Value.from_scaling([0.1, 0.2], "AP")), "10/20/30 (+0.1/0.2/0.2 AP)"),
+        (v(5, 5, 5).sub(rp.Value.from_scaling([0.5], "AP")), "5 (-0.5 AP)"),
+        (v(10, 20).sub(rp.Value.from_scalar(5)), "5/15"),
+        (rp.Value.from_scalar(1).sub(v(1, 2, 3)), "0/-1/-2"),
+        (v(10, 20).add(rp.Value.from_scaling([0.5], "AP")).mul(rp.Value.from_scalar(2)), "20/40 (+1 AP)"),
+        (rp.Value.from_scalar(2).mul(rp.Value.from_scaling([0.25, 0.5], "bonus AD")), "0 (+0.5/1 bonus AD)"),
+        (v(1, 2, 3).mul(v(2, 3)), "2/6/9"),
+        (rp.Value.from_scaling([0.5, 0.6], "AP").mul(v(1, 2)), "0 (+0.5/1.2 AP)"),
+        # A single-rank scaling term keeps its label; only the flat "" term is a scalar.
+        (rp.Value.from_scaling([0.25], "AP").mul(v(1, 2)), "0 (+0.25/0.5 AP)"),
+        (rp.Value.from_scalar(1).mul(rp.Value.from_scaling([1.2], "total AD")), "0 (+1.2 total AD)"),
+        (rp.Value.from_scaling([0.5], "max Health").mul(rp.Value.from_scalar(2)), "0 (+1 max Health)"),
+        (v(10, 20).truediv(rp.Value.from_scalar(4)), "2.5/5"),
+        (v(1, -2).add(rp.Value.from_scaling([0.3], "AP")).neg(), "-1/2 (-0.3 AP)"),
+        (rp.Value.from_levels(range(1, 19)).add(rp.Value.from_scalar(1)), "2–19"),
+    ],
+)
+def test_arithmetic_and_broadcasting(value, expected):
+    assert value.to_string() == expected
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        lambda: rp.Value.from_scaling([1, 2], "AP").mul(rp.Value.from_scaling([1, 2], "bonus AD")),
+        lambda: rp.Value.from_scaling([1], "max Health").mul(rp.Value.from_scaling([1], "current Health")),
+        lambda: v(10, 20).truediv(rp.Value.from_scaling([2], "AP")),
+        lambda: rp.Value.from_scaling([1], "AP").get_scalar(),
+        lambda: v(10, 20).truediv(v(1, 2)),
+        lambda: rp.Value.from_levels(range(18)).add(v(1, 2)),
+    ],
+)
+def test_unsupported_operations_raise(action):
+    with pytest.raises(ValueError):
+        action()
+
+
+def test_operations_never_modify_their_operands():
+    ranks = v(10, 20, 30)
+    short = rp.Value({"": rp._vector((5,)), "AP": rp._vector((0.1, 0.2))})
+    ratio = rp.Value.from_scaling([0.6], "AP")
+    scalar = rp.Value.from_scalar(2)
+    operands = (ranks, short, ratio, scalar)
+    before = [repr(value) for value in operands]
+    for left in operands:
+        left.to_string()
+        left.neg()
+        for right in operands:
+            for name in OPERATIONS:
+                try:
+                    getattr(left, name)(right)
+                except ValueError:
+                    pass
+    assert [repr(value) for value in operands] == before
+    # to_string broadcasts for display only; the stored base stays one rank long
+    assert len(short.terms[""]) == 1
+
+
+def test_symbol_table_values_are_shared_safely(corpus):
+    meta = corpus.meta["Ahri"]
+    champion = rp.ChampionResolver("Ahri", meta, corpus.store.load(corpus.aliases["Ahri"]), corpus.texts["en"]["Ahri"])
+    ability = champion.ability_at(0)
+    shared = ability.get_value("BaseDamage")
+    assert ability.get_value("basedamage") is not None
+    assert ability.get_value("BaseDamage") is shared
+    before = shared.to_string()
+    shared.add(rp.Value.from_scaling([0.5], "AP")).mul(rp.Value.from_scalar(2)).sub(shared).neg()
+    shared.mul(v(1, 2)).truediv(rp.Value.from_scalar(3))
+    assert shared.to_string() == before
+    assert ability.calculation("totaldamage") is ability.calculation("totaldamage")
+    assert rp.resolve_placeholder("BaseDamage * 2", "en", champion, ability) == shared.mul(rp.Value.from_scalar(2)).to_string()
+    assert shared.to_string() == before
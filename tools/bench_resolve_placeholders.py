@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Benchmark tools/resolve_placeholders.py against the cached corpus (no network).
+
+Stages timed per repeat:
+
+* ``load_<lang>``     - ``load_js_object`` on each champion_text_<lang>.js
+* ``store_sync``       - extracting every cached bin into a scratch SpellStore
+* ``build_resolvers``  - one ``ChampionResolver`` per champion
+* ``resolve_<lang>``   - ``resolve_locale`` over the whole roster, on text
+  restored from the Data Dragon sources (``source_entry``) so the
+  placeholders are still there to resolve
+* ``value_ops``        - ``Value`` arithmetic and formatting micro-cases
+* ``dump_<lang>``      - ``dump_js_object`` into a scratch directory
+
+``--scale N`` clones the roster N times (names suffixed ``~i``, same spell
+data) to show how each stage grows. Each clone gets its own alias and a
+hard-linked copy of its bin, so ``store_sync`` reads N times as many files;
+identical records are still stored once. Cloned text files are written in
+the same compact layout as the originals. Results are printed and
+optionally written as JSON; ``--baseline`` compares against an earlier
+result file and exits non-zero when a stage is slower than ``--threshold``.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import resolve_placeholders as rp
+
+VALUE_OPS_ROUNDS = 5000
+
+
+@dataclass
+class Corpus:
+    """The roster to benchmark: meta and alias per champion, bin directory and text file per locale."""
+
+    meta: Dict[str, Dict[str, object]]
+    aliases: Dict[str, str]
+    cache_dir: Path
+    paths: Dict[str, Path]
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def write_synthetic_corpus(scale: int, out_dir: Path) -> Corpus:
+    """Clone every champion ``scale`` times (scale 1 is the committed corpus, untouched)."""
+    meta = rp.load_js_document(rp.BASE_DIR / "champion_meta.js")["LOL_CHAMPIONS_META"].value
+    locales = rp.discover_locales()
+    aliases = {name: rp.normalize_alias(entry.get("id", name)) for name, entry in meta.items()}
+    if scale == 1:
+        return Corpus(meta, aliases, rp.CACHE_DIR, locales)
+
+    cache_dir = out_dir / "cdragon_cache"
+    cache_dir.mkdir()
+    scaled_meta: Dict[str, Dict[str, object]] = {}
+    scaled_aliases: Dict[str, str] = {}
+    for copy_idx in range(scale):
+        for name, entry in meta.items():
+            clone = name if copy_idx == 0 else f"{name}~{copy_idx}"
+            alias = aliases[name] if copy_idx == 0 else f"{aliases[name]}~{copy_idx}"
+            scaled_meta[clone] = entry
+            scaled_aliases[clone] = alias
+            source = rp.CACHE_DIR / f"{aliases[name]}.bin.json"
+            if source.exists():
+                link_or_copy(source, cache_dir / f"{alias}.bin.json")
+    paths: Dict[str, Path] = {}
+    for locale, source in locales.items():
+        var_name = rp.text_var_name(locale)
+        text, document = rp.load_js_object(source, var_name)
+        scaled = {
+            clone: text[clone.split("~", 1)[0]]
+            for clone in scaled_meta
+            if clone.split("~", 1)[0] in text
+        }
+        paths[locale] = out_dir / source.name
+        paths[locale].write_text(document.render({var_name: scaled}), encoding="utf-8")
+    return Corpus(scaled_meta, scaled_aliases, cache_dir, paths)
+
+
+def value_micro_cases(rounds: int = VALUE_OPS_ROUNDS) -> None:
+    ranks = rp.Value.from_numbers([10, 20, 30, 40, 50])
+    ratio = rp.Value.from_scaling([0.6], "AP")
+    bonus = rp.Value.from_scaling([1.1, 1.2, 1.3], "bonus AD").add(rp.Value.from_scaling([0.25], "AP"))
+    half = rp.Value.from_scalar(0.5)
+    for _ in range(rounds):
+        total = ranks.add(ratio).add(bonus).mul(half)
+        total.sub(ranks).truediv(rp.Value.from_scalar(2)).neg()
+        total.to_string()
+
+
+class Timer:
+    def __init__(self) -> None:
+        self.runs: Dict[str, List[float]] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        gc.collect()
+        start = time.perf_counter()
+        yield
+        self.runs.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def run_once(timer: Timer, corpus: Corpus, scratch: Path, counters: Dict[str, object]) -> None:
+    documents = {}
+    for locale, path in corpus.paths.items():
+        with timer.stage(f"load_{locale}"):
+            documents[locale] = rp.load_js_object(path, rp.text_var_name(locale))
+
+    # The committed text is already resolved; put the placeholders back the way
+    # tests/conftest.py does. Not timed: it reads one source file per champion.
+    sources = {
+        locale: {
+            name: rp.source_entry(entry, corpus.meta[name].get("id", name.split("~", 1)[0]), locale) or entry
+            for name, entry in text.items()
+            if name in corpus.meta and isinstance(entry, dict)
+        }
+        for locale, (text, _) in documents.items()
+    }
+
+    aliases = corpus.aliases
+    store_path = scratch / "spells.sqlite"
+    store_path.unlink(missing_ok=True)
+    with rp.SpellStore(store_path, corpus.cache_dir) as store:
+        with timer.stage("store_sync"):
+            store.sync(set(aliases.values()))
+
+        en_text = sources["en"]
+        with timer.stage("build_resolvers"):
+            resolvers = [
+                rp.ChampionResolver(name, entry, store.load(aliases[name]), en_text.get(name, {}))
+                for name, entry in corpus.meta.items()
+                if store.has(aliases[name])
+            ]
+
+    rp.compile_expression.cache_clear()
+    metrics = rp.RunMetrics()
+    for locale, text in sources.items():
+        entries = [
+            (champion, copy.deepcopy(text[champion.name]))
+            for champion in resolvers
+            if isinstance(text.get(champion.name), dict)
+        ]
+        with timer.stage(f"resolve_{locale}"):
+            for champion, entry in entries:
+                champion.resolve_locale(locale, entry, metrics)
+    counters["champions"] = len(resolvers)
+    for outcome in rp.RunMetrics.OUTCOMES:
+        counters[outcome] = metrics.counters.get(outcome, 0)
+
+    with timer.stage("value_ops"):
+        value_micro_cases()
+
+    for locale, (data, document) in documents.items():
+        with timer.stage(f"dump_{locale}"):
+            rp.dump_js_object(scratch / f"out_{document.path.name}", rp.text_var_name(locale), data, document)
+
+
+def summarize(timer: Timer) -> Dict[str, Dict[str, object]]:
+    return {
+        name: {"min": min(runs), "median": statistics.median(runs), "runs": runs}
+        for name, runs in timer.runs.items()
+    }
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], threshold: float) -> List[str]:
+    """Return one message per stage (or peak memory) that regressed past the threshold."""
+    if current.get("scale") != baseline.get("scale"):
+        return [f"baseline scale {baseline.get('scale')} does not match current scale {current.get('scale')}"]
+    regressions = []
+    for name, result in current["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if not before or before["min"] <= 0:
+            continue
+        ratio = result["min"] / before["min"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {before['min'] * 1000:.1f} ms -> {result['min'] * 1000:.1f} ms ({ratio:.2f}x)")
+    before_peak, peak = baseline.get("peak_memory_mb"), current.get("peak_memory_mb")
+    if before_peak and peak and peak / before_peak > 1 + threshold:
+        regressions.append(f"peak memory: {before_peak:.1f} MB -> {peak:.1f} MB ({peak / before_peak:.2f}x)")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="runs per stage (min and median are reported)")
+    parser.add_argument("--scale", type=int, default=1, help="clone the roster N times (e.g. 10 or 100)")
+    parser.add_argument("-o", "--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare against a previous results file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown per stage before failing (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    timer = Timer()
+    counters: Dict[str, object] = {}
+    with tempfile.TemporaryDirectory(prefix="bench_resolve_") as tmp:
+        scratch = Path(tmp)
+        corpus = write_synthetic_corpus(args.scale, scratch)
+        for _ in range(args.repeat):
+            run_once(timer, corpus, scratch, counters)
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "repeat": args.repeat,
+        **counters,
+        "stages": summarize(timer),
+        "peak_memory_mb": rp.peak_memory_mb(),
+    }
+
+    rp.debug(f"Champions: {results['champions']} (scale {args.scale}), repeat {args.repeat}")
+    for name, result in results["stages"].items():
+        rp.debug(f"  {name:<16} min {result['min'] * 1000:9.1f} ms   median {result['median'] * 1000:9.1f} ms")
+    if results["peak_memory_mb"] is not None:
+        rp.debug(f"  peak memory      {results['peak_memory_mb']:.1f} MB")
+    if args.output:
+        rp.write_atomic(args.output, (json.dumps(results, indent=2) + "\n").encode("utf-8"))
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        for message in regressions:
+            rp.debug(f"REGRESSION {message}")
+        if regressions:
+            return 1
+        rp.debug(f"No stage slower than baseline by more than {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
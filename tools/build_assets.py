@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Write content-hashed copies of the static assets plus WebP/size variants and one manifest.
+
+Every file matched by ``ASSET_GLOBS`` is copied to ``dist/<dir>/<stem>.<hash>.<ext>``
+so it can be served as immutable. When Pillow is installed, PNG icons also get
+a full-size WebP and WebP copies scaled to each of ``ICON_SIZES`` that is
+smaller than the original; loading-screen JPEGs get a WebP. The manifest
+(``dist/asset_manifest.json``) maps each logical path to its URLs::
+
+    {
+      "version": "15.22.1",
+      "options": {...},
+      "assets": {
+        "images/spell/AhriW.png": {
+          "url": "images/spell/AhriW.3f1c0a9b2d4e.png", "bytes": 5321, "source": "<sha256>",
+          "variants": [{"url": "images/spell/AhriW.9e8d7c6b5a4f.webp", "type": "image/webp",
+                        "w": 64, "h": 64, "bytes": 2210}, ...]
+        }, ...
+      }
+    }
+
+A file whose source hash matches the manifest is skipped when all its outputs
+still exist. Changing the transcode options rebuilds everything. Files listed
+in the previous manifest but not in the new one are removed; nothing else in
+the output directory is touched.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from resolve_placeholders import BASE_DIR, debug, read_data_version, write_atomic
+
+try:
+    from PIL import Image
+except ImportError:  # optional: without it assets are only hashed and copied
+    Image = None
+
+DIST_DIR = BASE_DIR / "dist"
+MANIFEST_NAME = "asset_manifest.json"
+ASSET_HASH_LENGTH = 12
+ASSET_GLOBS = (
+    "champion_meta.js",
+    "translations/*.js",
+    "data/champion/*.json",
+    "images/champion/*.png",
+    "images/champion/loading/*.jpg",
+    "images/spell/*.png",
+    "images/passive/*.png",
+)
+ICON_SIZES = (32, 64)
+WEBP_QUALITY = 85
+TRANSCODE_SUFFIXES = {".png", ".jpg"}
+
+
+def transcode_options() -> Dict[str, object]:
+    if Image is None:
+        return {"transcode": False}
+    return {"transcode": True, "sizes": list(ICON_SIZES), "webp_quality": WEBP_QUALITY}
+
+
+def hashed_name(logical: str, payload: bytes, suffix: Optional[str] = None, tag: str = "") -> str:
+    path = Path(logical)
+    digest = hashlib.sha256(payload).hexdigest()[:ASSET_HASH_LENGTH]
+    return (path.parent / f"{path.stem}{tag}.{digest}{suffix or path.suffix}").as_posix()
+
+
+def webp_variants(logical: str, raw: bytes) -> List[Tuple[Dict[str, object], bytes]]:
+    """Full-size WebP plus one scaled WebP per icon size below the original width (PNG only)."""
+    image = Image.open(io.BytesIO(raw))
+    image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    sizes = [image.width]
+    if logical.endswith(".png"):
+        sizes += [size for size in ICON_SIZES if size < image.width]
+    variants = []
+    for width in sizes:
+        height = round(image.height * width / image.width)
+        scaled = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        buffer = io.BytesIO()
+        scaled.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=6)
+        payload = buffer.getvalue()
+        tag = "" if width == image.width else f"@{width}"
+        entry = {
+            "url": hashed_name(logical, payload, ".webp", tag),
+            "type": "image/webp",
+            "w": width,
+            "h": height,
+            "bytes": len(payload),
+        }
+        variants.append((entry, payload))
+    return variants
+
+
+def output_urls(assets: Dict[str, Dict[str, object]]) -> Set[str]:
+    urls = set()
+    for entry in assets.values():
+        urls.add(entry["url"])
+        urls.update(variant["url"] for variant in entry.get("variants", []))
+    return urls
+
+
+def collect_sources() -> List[str]:
+    found = set()
+    for pattern in ASSET_GLOBS:
+        found.update(path.relative_to(BASE_DIR).as_posix() for path in BASE_DIR.glob(pattern) if path.is_file())
+    return sorted(found)
+
+
+def build_assets(out_dir: Path, previous: Dict[str, object], force: bool = False) -> Tuple[Dict[str, object], Dict[str, int]]:
+    options = transcode_options()
+    reusable = previous.get("options") == options and not force
+    old_assets: Dict[str, Dict[str, object]] = (previous.get("assets") or {}) if reusable else {}
+    assets: Dict[str, Dict[str, object]] = {}
+    summary = {"built": 0, "kept": 0, "removed": 0, "bytes": 0, "variant_bytes": 0}
+    for logical in collect_sources():
+        raw = (BASE_DIR / logical).read_bytes()
+        source = hashlib.sha256(raw).hexdigest()
+        old = old_assets.get(logical)
+        outputs = [old["url"], *(variant["url"] for variant in old.get("variants", []))] if old else []
+        if old and old.get("source") == source and all((out_dir / url).is_file() for url in outputs):
+            entry = old
+            summary["kept"] += 1
+        else:
+            entry = {"url": hashed_name(logical, raw), "bytes": len(raw), "source": source}
+            files = [(entry["url"], raw)]
+            if Image is not None and Path(logical).suffix in TRANSCODE_SUFFIXES:
+                try:
+                    variants = webp_variants(logical, raw)
+                except Exception as err:  # noqa: BLE001
+                    debug(f"Could not transcode {logical}: {err}")
+                    variants = []
+                entry["variants"] = [variant for variant, _ in variants]
+                files.extend((variant["url"], payload) for variant, payload in variants)
+            for url, payload in files:
+                target = out_dir / url
+                if not target.is_file():
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    write_atomic(target, payload)
+            summary["built"] += 1
+        assets[logical] = entry
+        summary["bytes"] += entry["bytes"]
+        summary["variant_bytes"] += sum(variant["bytes"] for variant in entry.get("variants", []))
+
+    # Only files the previous manifest lists are candidates, so other tools' output in out_dir is safe.
+    for url in sorted(output_urls(previous.get("assets") or {}) - output_urls(assets)):
+        stale = out_dir / url
+        if stale.is_file():
+            stale.unlink()
+            summary["removed"] += 1
+    return {"version": read_data_version(), "options": options, "assets": assets}, summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output-dir", type=Path, default=DIST_DIR)
+    parser.add_argument("--force", action="store_true", help="rebuild every asset even if its source is unchanged")
+    args = parser.parse_args(argv)
+    if Image is None:
+        debug("Pillow is not installed: assets are hashed and copied without WebP or size variants")
+
+    manifest_path = args.output_dir / MANIFEST_NAME
+    previous = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    manifest, summary = build_assets(args.output_dir, previous, force=args.force)
+    write_atomic(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+    print(f"{len(manifest['assets'])} assets: {summary['built']} built, {summary['kept']} unchanged, "
+          f"{summary['removed']} stale files removed; {summary['bytes'] // 1024} KB originals, "
+          f"{summary['variant_bytes'] // 1024} KB variants -> {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Build per-locale inverted indexes over the resolved ability text for the search box.
+
+Run after resolve_placeholders.py. Every champion ability (Q, W, E, R and the
+passive) is one document; its name, description, tooltip and level-up labels
+are stripped of HTML tags and leftover ``{{ }}`` placeholders, case-folded
+(``ё`` is folded to ``е``) and split into word tokens. Output
+(``search_index_<lang>.js``)::
+
+    window.LOL_SEARCH_INDEX_EN = {
+      "version": "15.22.1",
+      "locale": "en",
+      "slots": ["Q", "W", "E", "R", "P"],
+      "champions": ["Aatrox", ...],
+      "tokens": ["ability", "able", ...],   // sorted
+      "postings": [[3, 1, 12], ...],         // per token, delta-encoded doc ids
+      "trigrams": {"abi": [0, 4], ...}       // per trigram, delta-encoded token ids
+    }
+
+Document ``d`` is champion ``d // len(slots)``, slot ``d % len(slots)``. A
+query term matches every token it is a prefix of (binary search over
+``tokens``); terms of three or more characters also match inside tokens
+through ``trigrams``. Documents must match all terms. search() is the
+reference implementation of that lookup.
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from resolve_placeholders import BASE_DIR, discover_locales, load_js_document, load_js_object, text_var_name, write_atomic
+
+SLOTS = ("Q", "W", "E", "R", "P")
+TAG_PATTERN = re.compile(r"<[^>]*>|\{\{[^{}]*\}\}")
+WORD_PATTERN = re.compile(r"[^\W_]+")
+SPELL_FIELDS = ("name", "description", "tooltip")
+PASSIVE_FIELDS = ("name", "description")
+
+
+def normalize(text: str) -> str:
+    return text.casefold().replace("ё", "е")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    words = WORD_PATTERN.findall(normalize(TAG_PATTERN.sub(" ", text)))
+    return [word for word in words if len(word) > 1 and not word.isdigit()]
+
+
+def trigrams(token: str) -> Set[str]:
+    return {token[idx:idx + 3] for idx in range(len(token) - 2)}
+
+
+def ability_texts(entry: Dict[str, object]) -> Dict[str, List[str]]:
+    texts: Dict[str, List[str]] = {slot: [] for slot in SLOTS}
+    for idx, spell in enumerate((entry.get("spells") or [])[:4]):
+        if not isinstance(spell, dict):
+            continue
+        texts[SLOTS[idx]].extend(str(spell.get(field) or "") for field in SPELL_FIELDS)
+        leveltip = spell.get("leveltip")
+        if isinstance(leveltip, dict):
+            texts[SLOTS[idx]].extend(str(label) for label in leveltip.get("label") or [])
+    passive = entry.get("passive")
+    if isinstance(passive, dict):
+        texts["P"].extend(str(passive.get(field) or "") for field in PASSIVE_FIELDS)
+    return texts
+
+
+def _deltas(values: Iterable[int]) -> List[int]:
+    out, previous = [], 0
+    for value in sorted(values):
+        out.append(value - previous)
+        previous = value
+    return out
+
+
+def _undelta(deltas: Iterable[int]) -> List[int]:
+    out, total = [], 0
+    for delta in deltas:
+        total += delta
+        out.append(total)
+    return out
+
+
+def build_index(text: Dict[str, Dict[str, object]], locale: str, version: str) -> Dict[str, object]:
+    champions = sorted(name for name, entry in text.items() if isinstance(entry, dict))
+    docs_by_token: Dict[str, Set[int]] = {}
+    for champ_idx, name in enumerate(champions):
+        texts = ability_texts(text[name])
+        for slot_idx, slot in enumerate(SLOTS):
+            doc = champ_idx * len(SLOTS) + slot_idx
+            for field in texts[slot]:
+                for token in tokenize(field):
+                    docs_by_token.setdefault(token, set()).add(doc)
+
+    tokens = sorted(docs_by_token)
+    grams: Dict[str, Set[int]] = {}
+    for token_idx, token in enumerate(tokens):
+        for gram in trigrams(token):
+            grams.setdefault(gram, set()).add(token_idx)
+    return {
+        "version": version,
+        "locale": locale,
+        "slots": list(SLOTS),
+        "champions": champions,
+        "tokens": tokens,
+        "postings": [_deltas(docs_by_token[token]) for token in tokens],
+        "trigrams": {gram: _deltas(grams[gram]) for gram in sorted(grams)},
+    }
+
+
+def matching_tokens(index: Dict[str, object], term: str) -> Set[int]:
+    tokens: List[str] = index["tokens"]
+    found = set()
+    idx = bisect.bisect_left(tokens, term)
+    while idx < len(tokens) and tokens[idx].startswith(term):
+        found.add(idx)
+        idx += 1
+    if len(term) >= 3:
+        candidates: Optional[Set[int]] = None
+        for gram in trigrams(term):
+            ids = set(_undelta(index["trigrams"].get(gram, ())))
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                break
+        found.update(idx for idx in candidates or () if term in tokens[idx])
+    return found
+
+
+def search(index: Dict[str, object], query: str) -> List[str]:
+    """Return "Champion:slot" for every document containing all query terms (as prefixes or infixes)."""
+    docs: Optional[Set[int]] = None
+    for term in WORD_PATTERN.findall(normalize(query)):
+        matched: Set[int] = set()
+        for token_idx in matching_tokens(index, term):
+            matched.update(_undelta(index["postings"][token_idx]))
+        docs = matched if docs is None else docs & matched
+        if not docs:
+            return []
+    slots = index["slots"]
+    return [f"{index['champions'][doc // len(slots)]}:{slots[doc % len(slots)]}" for doc in sorted(docs or ())]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output-dir", type=Path, default=BASE_DIR)
+    parser.add_argument("--query", action="append", default=[], metavar="TEXT",
+                        help="run a query against each built index and print the hits (repeatable)")
+    args = parser.parse_args(argv)
+
+    version = str(load_js_document(BASE_DIR / "champion_meta.js")["LOL_DATA_VERSION"].value)
+    for locale, path in discover_locales().items():
+        text, _ = load_js_object(path, text_var_name(locale))
+        index = build_index(text, locale, version)
+        var_name = f"LOL_SEARCH_INDEX_{locale.upper()}"
+        payload = json.dumps(index, ensure_ascii=False, separators=(",", ":"))
+        output = args.output_dir / f"search_index_{locale}.js"
+        write_atomic(output, (
+            f"// League of Legends - Ability text search index ({locale})\n"
+            f"// Auto-generated by tools/build_search_index.py from {path.name}\n\n"
+            f"window.{var_name} = {payload};\n"
+        ).encode("utf-8"))
+        print(f"Wrote {len(index['tokens'])} tokens, {len(index['trigrams'])} trigrams "
+              f"({len(payload) // 1024} KB) to {output}")
+        for query in args.query:
+            start = time.perf_counter()
+            hits = search(index, query)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"  [{locale}] {query!r}: {len(hits)} hits in {elapsed:.2f} ms  {' '.join(hits[:8])}")
+
+
+if __name__ == "__main__":
+    main()
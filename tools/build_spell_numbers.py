@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Export per-rank ability numbers as structured data next to the resolved text.
+
+Uses the same ``ChampionResolver``/``AbilityResolver`` objects as
+resolve_placeholders.py (spell records come from the local SpellStore, so no
+network is needed) but keeps the numbers instead of formatting them. Output
+(``champion_numbers.js``)::
+
+    window.LOL_CHAMPION_NUMBERS = {
+      "version": "15.22.1",
+      "slots": ["Q", "W", "E", "R", "P"],
+      "champions": {
+        "Ahri": {
+          "Q": {
+            "maxrank": 5,
+            "cooldown": [7, 7, 7, 7, 7], "cost": [...], "range": [...],
+            "values": {"basedamage": [40, 65, 90, 115, 140], ...},
+            "calculations": {"totaldamage": {"base": [...], "scaling": {"AP": [0.5]}}, ...}
+          }, ...
+        }, ...
+      },
+      "bounds": {"cooldown": {"Q": [min, max], ..., "ALL": [min, max]}, "cost": ..., "range": ...}
+    }
+
+Bin ``mValues`` hold ranks 0..6, so ability values are cut to ranks
+1..maxrank; passives keep the raw vector. Calculations that scale with
+champion level carry ``"byLevel": true`` and 18 entries instead of ranks.
+Ranges at or above PLACEHOLDER_RANGE_THRESHOLD in script.js (global or
+unset) are left out of the bounds.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import resolve_placeholders as rp
+
+OUTPUT_PATH = rp.BASE_DIR / "champion_numbers.js"
+ABILITY_KEYS = ("Q", "W", "E", "R")
+SLOTS = ABILITY_KEYS + ("P",)
+BOUNDED_FIELDS = ("cooldown", "cost", "range")
+PLACEHOLDER_RANGE_THRESHOLD = 20000
+
+
+def _number(value: float) -> float:
+    value = round(value, 6)
+    return int(value) if value.is_integer() else value
+
+
+def _numbers(values: Sequence[float]) -> List[float]:
+    return [_number(x) for x in values]
+
+
+def rank_values(values: Sequence[float], maxrank: Optional[int]) -> List[float]:
+    return _numbers(rp.rank_values(list(values), maxrank))
+
+
+def value_numbers(value: rp.Value, maxrank: Optional[int]) -> Dict[str, object]:
+    def cut(coeffs: Sequence[float]) -> List[float]:
+        return _numbers(coeffs) if value.by_level else rank_values(coeffs, maxrank)
+
+    result: Dict[str, object] = {"base": cut(value.base())}
+    scaling = {
+        label: cut(coeffs)
+        for label, coeffs in value.terms.items()
+        if label and any(abs(x) >= 1e-8 for x in coeffs)
+    }
+    if scaling:
+        result["scaling"] = scaling
+    if value.by_level:
+        result["byLevel"] = True
+    return result
+
+
+def ability_numbers(ability: rp.AbilityResolver, maxrank: Optional[int]) -> Dict[str, object]:
+    entry: Dict[str, object] = {"maxrank": maxrank}
+    for field in BOUNDED_FIELDS:
+        values = getattr(ability, field)
+        if values:
+            entry[field] = _numbers(values[:maxrank] if maxrank else values)
+    entry["values"] = {name: rank_values(values, maxrank) for name, values in ability.data_values.items()}
+    calculations = {}
+    for key in ability.calculations:
+        try:
+            calculations[key] = value_numbers(ability.calculation(key), maxrank)
+        except Exception:  # noqa: BLE001
+            continue
+    entry["calculations"] = calculations
+    return entry
+
+
+def champion_numbers(champion: rp.ChampionResolver) -> Dict[str, Dict[str, object]]:
+    slots: Dict[str, Dict[str, object]] = {}
+    spells = champion.meta.get("spells") or []
+    for idx, key in enumerate(ABILITY_KEYS):
+        ability = champion.ability_at(idx)
+        if ability is not None:
+            maxrank = spells[idx].get("maxrank") if idx < len(spells) else None
+            slots[key] = ability_numbers(ability, int(maxrank) if maxrank else None)
+    passive = champion.abilities.get("passive")
+    if passive is not None:
+        slots["P"] = ability_numbers(passive, None)
+    return slots
+
+
+def field_bounds(champions: Dict[str, Dict[str, Dict[str, object]]]) -> Dict[str, Dict[str, List[float]]]:
+    bounds: Dict[str, Dict[str, List[float]]] = {}
+    for field in BOUNDED_FIELDS:
+        per_slot: Dict[str, List[float]] = {}
+        for slot in ABILITY_KEYS + ("ALL",):
+            values = [
+                x
+                for slots in champions.values()
+                for key in (ABILITY_KEYS if slot == "ALL" else (slot,))
+                for x in slots.get(key, {}).get(field) or []
+                if field != "range" or x < PLACEHOLDER_RANGE_THRESHOLD
+            ]
+            if values:
+                per_slot[slot] = [min(values), max(values)]
+        bounds[field] = per_slot
+    return bounds
+
+
+def build_numbers(store: rp.SpellStore, meta: Dict[str, Dict[str, object]], en_text: Dict[str, object], version: str) -> Dict[str, object]:
+    aliases = {name: rp.normalize_alias(entry.get("id", name)) for name, entry in meta.items()}
+    store.sync(aliases.values())
+    champions = {
+        name: champion_numbers(champion)
+        for name, champion in rp.iter_champions(rp.available_champions(meta, aliases, store, {}), store, en_text)
+    }
+    champions = {name: champions[name] for name in sorted(champions)}
+    return {"version": version, "slots": list(SLOTS), "champions": champions, "bounds": field_bounds(champions)}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    args = parser.parse_args(argv)
+
+    meta_doc = rp.load_js_document(rp.BASE_DIR / "champion_meta.js")
+    en_text, _ = rp.load_js_object(rp.TRANSLATIONS_DIR / "champion_text_en.js", rp.text_var_name("en"))
+    with rp.SpellStore() as store:
+        numbers = build_numbers(store, meta_doc["LOL_CHAMPIONS_META"].value, en_text, str(meta_doc["LOL_DATA_VERSION"].value))
+    payload = json.dumps(numbers, ensure_ascii=False, separators=(",", ":"))
+    text = (
+        "// League of Legends - Per-rank ability numbers\n"
+        "// Auto-generated by tools/build_spell_numbers.py from the cached Community Dragon bins\n\n"
+        f"window.LOL_CHAMPION_NUMBERS = {payload};\n"
+    )
+    rp.write_atomic(args.output, text.encode("utf-8"))
+    print(f"Wrote {len(numbers['champions'])} champions ({len(text) // 1024} KB) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Pack the champion, spell and passive icons into a few sprite atlases per category.
+
+Icons are the ``image.full`` files referenced by ``champion_meta.js`` under
+``images/<category>/``. Each icon is assigned to an atlas by a hash of its
+name (``ATLAS_CAPACITY`` icons per atlas on average), so adding or changing
+one icon only rebuilds the atlas it lands in; atlases whose members and
+member bytes are unchanged are kept. Atlas files are content-hashed
+(``images/atlas/<category>-<n>.<hash>.png``) so they can be cached forever.
+
+Output (``sprite_atlases.js``)::
+
+    window.LOL_SPRITE_ATLASES = {
+      "version": "15.22.1",
+      "atlases": {"champion-0": {"file": "images/atlas/champion-0.1a2b3c4d5e6f.png",
+                                 "w": 1024, "h": 1024, "key": "<members digest>"}, ...},
+      "images": {"champion": {"Aatrox.png": ["champion-0", x, y, w, h], ...},
+                 "spell": {...}, "passive": {...}}
+    }
+
+Requires Pillow.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import sys
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from resolve_placeholders import BASE_DIR, debug, load_js_document, write_atomic
+
+try:
+    from PIL import Image
+except ImportError:  # checked in main()
+    Image = None
+
+IMAGES_DIR = BASE_DIR / "images"
+ATLAS_DIR = IMAGES_DIR / "atlas"
+OUTPUT_PATH = BASE_DIR / "sprite_atlases.js"
+CATEGORIES = ("champion", "spell", "passive")
+ATLAS_CAPACITY = {"champion": 64, "spell": 256, "passive": 256}
+ATLAS_HASH_LENGTH = 12
+
+
+def referenced_images(meta: Dict[str, Dict[str, object]]) -> Dict[str, List[str]]:
+    """image.full names per category, as champion_meta.js references them."""
+    found: Dict[str, set] = {category: set() for category in CATEGORIES}
+    for entry in meta.values():
+        found["champion"].add((entry.get("image") or {}).get("full"))
+        for spell in entry.get("spells") or []:
+            found["spell"].add((spell.get("image") or {}).get("full"))
+        found["passive"].add(((entry.get("passive") or {}).get("image") or {}).get("full"))
+    return {category: sorted(name for name in names if name) for category, names in found.items()}
+
+
+def assign_atlases(category: str, names: List[str]) -> Dict[str, List[str]]:
+    count = max(1, math.ceil(len(names) / ATLAS_CAPACITY[category]))
+    groups: Dict[str, List[str]] = {f"{category}-{idx}": [] for idx in range(count)}
+    for name in names:
+        groups[f"{category}-{zlib.crc32(name.encode('utf-8')) % count}"].append(name)
+    return {atlas: members for atlas, members in groups.items() if members}
+
+
+def members_key(sources: Dict[str, bytes]) -> str:
+    digest = hashlib.sha1()
+    for name in sorted(sources):
+        digest.update(f"{name}\n{hashlib.sha1(sources[name]).hexdigest()}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def pack_atlas(sources: Dict[str, bytes]) -> Tuple[bytes, int, int, Dict[str, Tuple[int, int, int, int]]]:
+    """Lay the icons out on a near-square grid of equal cells, in name order."""
+    images = {name: Image.open(io.BytesIO(raw)) for name, raw in sorted(sources.items())}
+    cell_w = max(image.width for image in images.values())
+    cell_h = max(image.height for image in images.values())
+    columns = math.ceil(math.sqrt(len(images)))
+    rows = math.ceil(len(images) / columns)
+    mode = "RGB" if all(image.mode == "RGB" for image in images.values()) else "RGBA"
+    sheet = Image.new(mode, (columns * cell_w, rows * cell_h))
+    positions = {}
+    for idx, (name, image) in enumerate(images.items()):
+        x, y = (idx % columns) * cell_w, (idx // columns) * cell_h
+        sheet.paste(image.convert(mode), (x, y))
+        positions[name] = (x, y, image.width, image.height)
+    buffer = io.BytesIO()
+    sheet.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue(), sheet.width, sheet.height, positions
+
+
+def load_previous(path: Path) -> Dict[str, object]:
+    if not path.exists():
+        return {}
+    try:
+        return load_js_document(path)["LOL_SPRITE_ATLASES"].value
+    except Exception:  # noqa: BLE001
+        return {}
+
+
+def build_atlases(meta: Dict[str, Dict[str, object]], version: str, previous: Dict[str, object],
+                  force: bool = False) -> Tuple[Dict[str, object], Dict[str, int]]:
+    atlases: Dict[str, Dict[str, object]] = {}
+    images: Dict[str, Dict[str, list]] = {}
+    summary = {"built": 0, "kept": 0, "missing": 0}
+    old_atlases = previous.get("atlases") or {}
+    old_images = previous.get("images") or {}
+    ATLAS_DIR.mkdir(parents=True, exist_ok=True)
+    for category, names in referenced_images(meta).items():
+        available = [name for name in names if (IMAGES_DIR / category / name).is_file()]
+        for name in sorted(set(names) - set(available)):
+            debug(f"Missing {category} icon {name}")
+        summary["missing"] += len(names) - len(available)
+        images[category] = {}
+        for atlas, members in assign_atlases(category, available).items():
+            sources = {name: (IMAGES_DIR / category / name).read_bytes() for name in members}
+            key = members_key(sources)
+            old = old_atlases.get(atlas) or {}
+            if not force and old.get("key") == key and (BASE_DIR / old.get("file", "")).is_file():
+                atlases[atlas] = old
+                for name in members:
+                    images[category][name] = old_images[category][name]
+                summary["kept"] += 1
+                continue
+            raw, width, height, positions = pack_atlas(sources)
+            file_name = f"{atlas}.{hashlib.sha256(raw).hexdigest()[:ATLAS_HASH_LENGTH]}.png"
+            write_atomic(ATLAS_DIR / file_name, raw)
+            atlases[atlas] = {
+                "file": (ATLAS_DIR / file_name).relative_to(BASE_DIR).as_posix(),
+                "w": width,
+                "h": height,
+                "key": key,
+            }
+            for name, (x, y, w, h) in positions.items():
+                images[category][name] = [atlas, x, y, w, h]
+            summary["built"] += 1
+    keep = {Path(entry["file"]).name for entry in atlases.values()}
+    for stale in ATLAS_DIR.glob("*.png"):
+        if stale.name not in keep:
+            stale.unlink()
+    return {"version": version, "atlases": atlases, "images": images}, summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    parser.add_argument("--force", action="store_true", help="rebuild every atlas even if its members are unchanged")
+    args = parser.parse_args(argv)
+    if Image is None:
+        sys.exit("build_sprite_atlases.py needs Pillow (pip install Pillow)")
+
+    meta_doc = load_js_document(BASE_DIR / "champion_meta.js")
+    manifest, summary = build_atlases(
+        meta_doc["LOL_CHAMPIONS_META"].value,
+        str(meta_doc["LOL_DATA_VERSION"].value),
+        load_previous(args.output),
+        force=args.force,
+    )
+    payload = json.dumps(manifest, ensure_ascii=False, separators=(",", ":"))
+    write_atomic(args.output, (
+        "// League of Legends - Icon sprite atlases\n"
+        "// Auto-generated by tools/build_sprite_atlases.py\n\n"
+        f"window.LOL_SPRITE_ATLASES = {payload};\n"
+    ).encode("utf-8"))
+    icons = sum(len(names) for names in manifest["images"].values())
+    print(f"Packed {icons} icons into {len(manifest['atlases'])} atlases ({summary['built']} built, "
+          f"{summary['kept']} kept, {summary['missing']} missing) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Precompute per-level (1-18) champion base-stat curves into a columnar Float32 file.
+
+Reads ``LOL_CHAMPION_INDEX[*].stats`` from ``champion_meta.js`` and writes
+``data/stat_curves.bin`` (all values little-endian)::
+
+    offset  type            field
+    0       char[4]         magic "LOLS"
+    4       uint16          format version (1)
+    6       uint16          levels (18)
+    8       uint16          champion count C
+    10      uint16          column count K
+    12      uint32          byte offset of the bounds block
+    16      uint32          byte offset of the data block
+    20      str             data version
+    ...     str[K]          column names
+    ...     str[C]          champion ids, in row order
+    bounds  float32[K*L*2]  (min, max) across champions for each column/level
+    data    float32[K*C*L]  column-major; column k, champion c, level l at
+                            ((k * C) + c) * L + (l - 1)
+
+``str`` is a uint16 byte length followed by UTF-8 bytes. Both blocks start on
+a 4-byte boundary so the page can wrap them in ``Float32Array`` directly.
+
+Growth uses the in-game curve ``base + g * (l - 1) * (0.7025 + 0.0175 * (l - 1))``
+(attack speed grows as a percentage of base). At level 18 it is exactly the
+linear ``base + g * 17`` that ``computeChampionDpsValues`` in script.js uses,
+so the ``dps`` column at levels 1 and 18 matches ``dps0``/``dps18``.
+"""
+from __future__ import annotations
+
+import argparse
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from resolve_placeholders import BASE_DIR, load_js_document, write_atomic
+
+OUTPUT_PATH = BASE_DIR / "data" / "stat_curves.bin"
+MAGIC = b"LOLS"
+FORMAT_VERSION = 1
+LEVELS = 18
+HEADER = struct.Struct("<4sHHHHII")
+
+# column -> (base key, per-level key); None means the stat does not grow.
+GROWING_STATS: Tuple[Tuple[str, str, Optional[str]], ...] = (
+    ("hp", "hp", "hpperlevel"),
+    ("mp", "mp", "mpperlevel"),
+    ("armor", "armor", "armorperlevel"),
+    ("spellblock", "spellblock", "spellblockperlevel"),
+    ("hpregen", "hpregen", "hpregenperlevel"),
+    ("mpregen", "mpregen", "mpregenperlevel"),
+    ("crit", "crit", "critperlevel"),
+    ("attackdamage", "attackdamage", "attackdamageperlevel"),
+    ("movespeed", "movespeed", None),
+    ("attackrange", "attackrange", None),
+)
+COLUMNS = tuple(name for name, _, _ in GROWING_STATS) + ("attackspeed", "dps")
+STAT_DEFAULTS = {"attackrange": 125.0}
+
+
+def growth_factor(level: int) -> float:
+    steps = level - 1
+    return steps * (0.7025 + 0.0175 * steps)
+
+
+def _number(stats: Dict[str, object], key: str) -> float:
+    try:
+        return float(stats.get(key, STAT_DEFAULTS.get(key, 0)) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def champion_curves(stats: Dict[str, object]) -> Dict[str, List[float]]:
+    curves: Dict[str, List[float]] = {}
+    factors = [growth_factor(level) for level in range(1, LEVELS + 1)]
+    for column, base_key, growth_key in GROWING_STATS:
+        base = _number(stats, base_key)
+        growth = _number(stats, growth_key) if growth_key else 0.0
+        curves[column] = [base + growth * factor for factor in factors]
+    base_as = _number(stats, "attackspeed")
+    as_growth = _number(stats, "attackspeedperlevel") / 100
+    curves["attackspeed"] = [base_as * (1 + as_growth * factor) for factor in factors]
+    curves["dps"] = [ad * aspd for ad, aspd in zip(curves["attackdamage"], curves["attackspeed"])]
+    return curves
+
+
+def _pack_str(value: str) -> bytes:
+    raw = value.encode("utf-8")
+    return struct.pack("<H", len(raw)) + raw
+
+
+def _align(blob: bytearray) -> None:
+    blob.extend(b"\0" * (-len(blob) % 4))
+
+
+def _float32_bytes(values: List[float]) -> bytes:
+    packed = array("f", values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def build_curves(index: Dict[str, Dict[str, object]], version: str) -> bytes:
+    champions = sorted(index)
+    per_champion = [champion_curves(index[name].get("stats") or {}) for name in champions]
+
+    data: List[float] = []
+    bounds: List[float] = []
+    for column in COLUMNS:
+        rows = [curves[column] for curves in per_champion]
+        for row in rows:
+            data.extend(row)
+        for level in range(LEVELS):
+            values = [row[level] for row in rows]
+            bounds.extend((min(values), max(values)) if values else (0.0, 0.0))
+
+    tables = bytearray(_pack_str(version))
+    for name in COLUMNS + tuple(champions):
+        tables += _pack_str(name)
+    bounds_offset = HEADER.size + len(tables)
+    bounds_offset += -bounds_offset % 4
+    data_offset = bounds_offset + len(bounds) * 4
+
+    blob = bytearray(HEADER.pack(
+        MAGIC, FORMAT_VERSION, LEVELS, len(champions), len(COLUMNS), bounds_offset, data_offset,
+    ))
+    blob += tables
+    _align(blob)
+    blob += _float32_bytes(bounds)
+    blob += _float32_bytes(data)
+    return bytes(blob)
+
+
+def read_curves(raw: bytes) -> Dict[str, object]:
+    """Decode a stat curve file back into plain lists (for inspection and checks)."""
+    magic, fmt, levels, count, columns, bounds_offset, data_offset = HEADER.unpack_from(raw, 0)
+    if magic != MAGIC or fmt != FORMAT_VERSION:
+        raise ValueError("Not a stat curve file")
+    pos = HEADER.size
+    strings: List[str] = []
+    for _ in range(1 + columns + count):
+        (length,) = struct.unpack_from("<H", raw, pos)
+        strings.append(raw[pos + 2:pos + 2 + length].decode("utf-8"))
+        pos += 2 + length
+    floats = array("f")
+    floats.frombytes(raw[bounds_offset:])
+    if sys.byteorder != "little":
+        floats.byteswap()
+    names, champions = strings[1:1 + columns], strings[1 + columns:]
+    bounds_len = columns * levels * 2
+    bounds, data = floats[:bounds_len], floats[bounds_len:]
+    return {
+        "version": strings[0],
+        "champions": champions,
+        "bounds": {
+            name: [tuple(bounds[(k * levels + lvl) * 2:(k * levels + lvl) * 2 + 2]) for lvl in range(levels)]
+            for k, name in enumerate(names)
+        },
+        "curves": {
+            name: {
+                champ: list(data[(k * count + c) * levels:(k * count + c + 1) * levels])
+                for c, champ in enumerate(champions)
+            }
+            for k, name in enumerate(names)
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    args = parser.parse_args(argv)
+
+    meta_doc = load_js_document(BASE_DIR / "champion_meta.js")
+    index = meta_doc["LOL_CHAMPION_INDEX"].value
+    raw = build_curves(index, str(meta_doc["LOL_DATA_VERSION"].value))
+    write_atomic(args.output, raw)
+    print(f"Wrote {len(index)} champions x {len(COLUMNS)} stats x {LEVELS} levels ({len(raw)} bytes) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
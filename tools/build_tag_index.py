@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Build the per-ability filter tag bitset index from the resolved English text.
+
+Mirrors parseAbilityTagsFromText, accumulateChampionTags,
+extractDamageTypesFromDetailEN and hasOwnHealthScaling in script.js, so the
+page can filter with bitwise AND instead of running regexes at load time.
+
+Output (``champion_tags.js``)::
+
+    window.LOL_CHAMPION_TAGS = {
+      "version": "15.22.1",
+      "bits": ["mobility", ..., "physical", "magic", "scalesHealth"],
+      "slots": ["Q", "W", "E", "R", "P", "ALL"],
+      "champions": ["Aatrox", ...],
+      "masks": [...]   // len(champions) * len(slots), champion-major
+    }
+
+``masks[c * len(slots) + s]`` has bit ``i`` set when champion ``c`` carries
+``bits[i]`` in slot ``s``. ``ALL`` is the champion-wide set the filters use
+when no per-ability checkbox is ticked (it includes passive tags).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set
+
+from resolve_placeholders import BASE_DIR, TRANSLATIONS_DIR, load_js_document, write_atomic
+
+OUTPUT_PATH = BASE_DIR / "champion_tags.js"
+
+ABILITY_KEYS = ("Q", "W", "E", "R")
+SLOTS = ABILITY_KEYS + ("P", "ALL")
+TAG_BITS = (
+    "mobility", "stun", "root", "knockup", "silence", "slow", "pull", "stealth",
+    "attackspeed", "movespeed", "shield", "heal", "lifesteal",
+)
+DAMAGE_BITS = ("physical", "magic")
+BITS = TAG_BITS + DAMAGE_BITS + ("scalesHealth",)
+BIT_INDEX = {name: idx for idx, name in enumerate(BITS)}
+
+# JS regexes (no "u" flag): \b and \w are ASCII-only, "." stops at any line
+# terminator and \s covers the Unicode spaces listed in ECMA-262.
+JS_DOT = r"[^\n\r\u2028\u2029]"
+JS_SPACE = r"[\t\n\v\f\r \u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\ufeff]"
+
+
+def _js(pattern: str, flags: int = 0) -> re.Pattern[str]:
+    return re.compile(pattern.replace(r"\s", JS_SPACE).replace(".", JS_DOT), re.ASCII | flags)
+
+
+TAG_RULES = (
+    ("mobility", _js(r"\b(dash|dashes|blink|blinks|leap|leaps|jump|jumps|teleport|teleports|reposition|untargetable)\b")),
+    ("stun", _js(r"\b(stun|stunned)\b")),
+    ("root", _js(r"\b(root|rooted|immobilize|immobilized|snare|snared)\b")),
+    ("knockup", _js(r"\b(knock\s?up|airborne|launched)\b")),
+    ("knockup", _js(r"\b(knock\s?back|pushed back|displace|displaced)\b")),
+    ("silence", _js(r"\b(silence|silenced)\b")),
+    ("slow", _js(r"\b(slow|slowed)\b")),
+    ("pull", _js(r"\b(pull|pulls|pulled|drag|drags|dragged|grab|grabs|grabbed)\b")),
+    ("stealth", _js(r"\b(stealth|invisible|camouflage|camouflaged)\b")),
+    ("attackspeed", _js(r"\b(attack speed|bonus attack speed|increases attack speed)\b")),
+    ("movespeed", _js(r"\b(movement speed|move speed|bonus movement speed|increases movement speed|gain movement speed)\b")),
+    ("shield", _js(r"\b(shield|shielded)\b")),
+    ("heal", _js(r"\b(heal|heals|healed|restore health|restores health)\b")),
+)
+LIFESTEAL_RULES = (
+    _js(r"\b(lifesteal|life steal|omnivamp|spell vamp|vamp)\b", re.IGNORECASE),
+    _js(r"\{\{\s*(vamp|lifesteal|omnivamp)", re.IGNORECASE),
+    _js(r"(heal|healing|heals).{0,15}(for|from).{0,15}(damage dealt|damage)", re.IGNORECASE),
+    _js(r"(heal|healing|heals).{0,15}(% of|percent of).{0,15}damage", re.IGNORECASE),
+    _js(r"(damage dealt|damage).{0,15}(as health|as healing)", re.IGNORECASE),
+    _js(r"восстанавливает.{0,20}(от|процент).{0,15}(нанесенного урона|урона)", re.IGNORECASE),
+)
+HEALTH_PLACEHOLDERS = (
+    "maxhealth", "bonushealth", "missinghealthpercent", "missinghealthdamage",
+    "percenthealth", "percentmaxhealth", "maxhealthpercent", "maxhealthdamage",
+    "percenthealthbase", "percenthealthempowered", "totalpercenthealth",
+)
+HEALTH_LINKS = ("health", "maxhealth", "bonushealth")
+
+
+def parse_ability_tags(text: Optional[str]) -> Set[str]:
+    if not text:
+        return set()
+    lowered = text.lower()
+    tags = {tag for tag, pattern in TAG_RULES if pattern.search(lowered)}
+    if any(pattern.search(lowered) for pattern in LIFESTEAL_RULES):
+        tags.add("lifesteal")
+    return tags
+
+
+def damage_types(text: Optional[str]) -> Set[str]:
+    lowered = (text or "").lower()
+    found = set()
+    if "magic damage" in lowered:
+        found.add("magic")
+    if "physical damage" in lowered:
+        found.add("physical")
+    return found
+
+
+def has_health_placeholder(text: Optional[str]) -> bool:
+    if not text:
+        return False
+    lowered = text.lower()
+    return any(f"{{{{ {name}" in lowered for name in HEALTH_PLACEHOLDERS)
+
+
+def merge_detail(meta_entry: Dict[str, object], text_entry: Dict[str, object]) -> Dict[str, object]:
+    """Combine meta and locale text the way loadChampionDetailByLocale does."""
+    text_spells = text_entry.get("spells") or []
+    spells = [
+        {**spell_meta, **(text_spells[idx] if idx < len(text_spells) else {})}
+        for idx, spell_meta in enumerate(meta_entry.get("spells") or [])
+    ]
+    passive = {**(meta_entry.get("passive") or {}), **(text_entry.get("passive") or {})}
+    return {"spells": spells, "passive": passive}
+
+
+def _join_label(label: Sequence[object]) -> str:
+    return " ".join("" if part is None else str(part) for part in label)
+
+
+def champion_slot_bits(detail: Dict[str, object]) -> Dict[str, Set[str]]:
+    slots: Dict[str, Set[str]] = {slot: set() for slot in SLOTS}
+    links: Set[str] = set()
+    for idx, spell in enumerate((detail.get("spells") or [])[:len(ABILITY_KEYS)]):
+        slot = slots[ABILITY_KEYS[idx]]
+        for text in (spell.get("name"), spell.get("description"), spell.get("tooltip")):
+            slot |= parse_ability_tags(text)
+        leveltip = spell.get("leveltip")
+        if isinstance(leveltip, dict) and leveltip.get("label"):
+            slot |= parse_ability_tags(_join_label(leveltip["label"]))
+        slot |= damage_types(spell.get("tooltip")) | damage_types(spell.get("description"))
+        # script.js never resets the link set between spells; keep that behaviour.
+        for var in spell.get("vars") or []:
+            if isinstance(var, dict) and isinstance(var.get("link"), str):
+                links.add(var["link"].lower())
+        if any(link in links for link in HEALTH_LINKS) or has_health_placeholder(spell.get("tooltip")) \
+                or has_health_placeholder(spell.get("description")):
+            slot.add("scalesHealth")
+
+    passive = detail.get("passive") or {}
+    if passive:
+        for text in (passive.get("name"), passive.get("description"), passive.get("tooltip")):
+            slots["P"] |= parse_ability_tags(text)
+        slots["P"] |= damage_types(passive.get("description"))
+        if has_health_placeholder(passive.get("description")):
+            for key in ABILITY_KEYS:
+                slots[key].add("scalesHealth")
+
+    for slot in ABILITY_KEYS + ("P",):
+        slots["ALL"] |= slots[slot]
+    return slots
+
+
+def to_mask(bits: Set[str]) -> int:
+    mask = 0
+    for name in bits:
+        mask |= 1 << BIT_INDEX[name]
+    return mask
+
+
+def build_index(meta: Dict[str, Dict[str, object]], en_text: Dict[str, Dict[str, object]], version: str) -> Dict[str, object]:
+    champions = sorted(name for name in meta if isinstance(en_text.get(name), dict))
+    masks: List[int] = []
+    for name in champions:
+        slots = champion_slot_bits(merge_detail(meta[name], en_text[name]))
+        masks.extend(to_mask(slots[slot]) for slot in SLOTS)
+    return {"version": version, "bits": list(BITS), "slots": list(SLOTS), "champions": champions, "masks": masks}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    args = parser.parse_args(argv)
+
+    meta_doc = load_js_document(BASE_DIR / "champion_meta.js")
+    en_doc = load_js_document(TRANSLATIONS_DIR / "champion_text_en.js")
+    index = build_index(
+        meta_doc["LOL_CHAMPIONS_META"].value,
+        en_doc["LOL_CHAMPIONS_TEXT_EN"].value,
+        str(meta_doc["LOL_DATA_VERSION"].value),
+    )
+    payload = json.dumps(index, ensure_ascii=False, separators=(",", ":"))
+    text = (
+        "// League of Legends - Ability filter tag bitsets\n"
+        "// Auto-generated by tools/build_tag_index.py from champion_text_en.js\n\n"
+        f"window.LOL_CHAMPION_TAGS = {payload};\n"
+    )
+    write_atomic(args.output, text.encode("utf-8"))
+    print(f"Wrote {len(index['champions'])} champions x {len(SLOTS)} slots to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
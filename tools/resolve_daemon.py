@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""Keep the placeholder resolver resident: re-resolve edited inputs and answer local queries.
+
+Spell records and one ``ChampionResolver`` per champion stay in memory. Every
+``--interval`` seconds the daemon stats ``champion_meta.js``, each
+``translations/champion_text_<lang>.js`` and the cached bins; when one of them
+changes it reloads only that file and re-resolves the champions (and locales)
+whose inputs changed, using the same ``ResolveManifest`` as the batch script.
+
+Queries are served as JSON over HTTP on 127.0.0.1::
+
+    GET  /resolve?champion=Ahri&ability=q&expr=totaldamage&locale=ru
+    GET  /champion?name=Ahri&locale=ru      resolved text entry
+    GET  /status                            roster, locales and the last rebuild
+    POST /refresh                           poll now and wait for the rebuild
+
+Polling uses only the standard library (no inotify binding needed) and costs
+a couple of hundred ``stat`` calls per tick.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import resolve_placeholders as rp
+
+META_PATH = rp.BASE_DIR / "champion_meta.js"
+DEFAULT_PORT = 8765
+POLL_INTERVAL = 1.0
+REFRESH_TIMEOUT = 30.0
+
+
+def file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class ResolverDaemon:
+    """In-memory resolver state; poll() must always run on the thread that created it.
+
+    The spell store's SQLite connection is bound to that thread, so query
+    threads only read the resolvers and texts (under ``lock``) and ask for an
+    early poll through request_poll().
+    """
+
+    def __init__(self, locales: Optional[List[str]] = None):
+        self.locales = locales
+        self.lock = threading.RLock()
+        self.polled = threading.Condition(self.lock)
+        self.wake = threading.Event()
+        self.generation = 0
+        self.store = rp.SpellStore()
+        self.manifest = rp.ResolveManifest(rp.RESOLVE_MANIFEST_PATH, rp.resolver_fingerprint())
+        self.meta: Dict[str, Dict[str, object]] = {}
+        self.aliases: Dict[str, str] = {}
+        self.names: Dict[str, str] = {}
+        self.paths: Dict[str, Path] = {}
+        self.documents: Dict[str, Tuple[Dict[str, object], rp.JsDocument]] = {}
+        self.resolvers: Dict[str, rp.ChampionResolver] = {}
+        self.inputs: Dict[str, Tuple[object, ...]] = {}
+        self.signatures: Dict[Path, Optional[Tuple[int, int]]] = {}
+        self.last: Dict[str, object] = {}
+
+    def close(self) -> None:
+        self.store.close()
+
+    def watched(self) -> List[Path]:
+        paths = [META_PATH, *self.paths.values()]
+        paths.extend(self.store.cache_dir / f"{alias}.bin.json" for alias in self.aliases.values())
+        return paths
+
+    def poll(self, force: bool = False) -> Optional[Dict[str, object]]:
+        """Reload whatever changed on disk and re-resolve it; returns a summary or None if idle."""
+        locales = rp.discover_locales()
+        if self.locales is not None:
+            locales = {locale: path for locale, path in locales.items() if locale in self.locales}
+        changed = [path for path in self.watched() if file_signature(path) != self.signatures.get(path)]
+        if locales != self.paths:
+            changed.extend(path for path in locales.values() if path not in changed)
+        if not changed and not force:
+            self._advance()
+            return None
+
+        with self.lock:
+            metrics = rp.RunMetrics()
+            with metrics.stage("load"):
+                self._reload(changed, locales)
+            with metrics.stage("resolve"):
+                resolved, passes, written = self._resolve_stale(metrics)
+            summary = {
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "changed": sorted(str(path.relative_to(rp.BASE_DIR)) for path in changed),
+                "champions_resolved": resolved,
+                "locale_passes": passes,
+                "written": written,
+                "seconds": round(sum(metrics.stages.values()), 4),
+                **{outcome: metrics.counters.get(outcome, 0) for outcome in rp.RunMetrics.OUTCOMES},
+            }
+            self.last = summary
+            self._advance()
+        return summary
+
+    def request_poll(self, timeout: float = REFRESH_TIMEOUT) -> bool:
+        """Wake the polling thread and wait until it has finished one more pass."""
+        with self.polled:
+            target = self.generation + 1
+            self.wake.set()
+            return self.polled.wait_for(lambda: self.generation >= target, timeout)
+
+    def _advance(self) -> None:
+        with self.polled:
+            self.generation += 1
+            self.polled.notify_all()
+
+    def _reload(self, changed: List[Path], locales: Dict[str, Path]) -> None:
+        # Signatures are taken before each read but recorded only once it succeeded,
+        # so a file caught half-saved still counts as changed on the next tick.
+        if META_PATH in changed or not self.meta:
+            signature = file_signature(META_PATH)
+            self.meta = rp.load_js_document(META_PATH)["LOL_CHAMPIONS_META"].value
+            self.signatures[META_PATH] = signature
+            self.aliases = {name: rp.normalize_alias(entry.get("id", name)) for name, entry in self.meta.items()}
+            self.names = {key.lower(): name for name in self.meta for key in (name, self.aliases[name])}
+            for name in set(self.resolvers) - set(self.meta):
+                del self.resolvers[name]
+                self.inputs.pop(name, None)
+
+        if "en" not in locales:
+            raise rp.LoadError("champion_text_en.js is required (it carries each champion's partype)")
+        for locale in set(self.documents) - set(locales):
+            del self.documents[locale]
+            self.signatures.pop(self.paths[locale], None)
+        for locale, path in locales.items():
+            if path in changed or locale not in self.documents:
+                signature = file_signature(path)
+                self.documents[locale] = rp.load_js_object(path, rp.text_var_name(locale))
+                self.signatures[path] = signature
+        self.paths = locales
+
+        bins = {alias: self.store.cache_dir / f"{alias}.bin.json" for alias in self.aliases.values()}
+        signatures = {path: file_signature(path) for path in bins.values()}
+        self.store.sync(alias for alias, path in bins.items() if signatures[path] is not None)
+        self.signatures.update(signatures)
+
+    def _resolve_stale(self, metrics: rp.RunMetrics) -> Tuple[int, int, List[str]]:
+        texts = tuple((locale, data) for locale, (data, _) in self.documents.items())
+        en_text = self.documents["en"][0]
+        resolved = passes = 0
+        changed_locales = set()
+        for name, meta_entry in self.meta.items():
+            alias = self.aliases[name]
+            spell_digest = self.store.digest(alias)
+            if spell_digest is None:
+                continue
+            en_entry = en_text.get(name, {})
+            inputs = (rp.content_hash(meta_entry), spell_digest, en_entry.get("partype"))
+            if self.inputs.get(name) != inputs:
+                self.resolvers[name] = rp.ChampionResolver(name, meta_entry, self.store.load(alias), en_entry)
+                self.inputs[name] = inputs
+            before = self.manifest.fingerprint(name, meta_entry, spell_digest, texts)
+            stale = self.manifest.stale_locales(name, before)
+            if not stale:
+                continue
+            rp.resolve_champion(self.resolvers[name], [(loc, data) for loc, data in texts if loc in stale], metrics)
+            after = self.manifest.fingerprint(name, meta_entry, spell_digest, texts)
+            changed_locales.update(loc for loc, digest in after["text"].items() if digest != before["text"][loc])
+            self.manifest.record(name, after)
+            resolved += 1
+            passes += len(stale)
+
+        for locale in sorted(changed_locales):
+            data, document = self.documents[locale]
+            rp.dump_js_object(document.path, rp.text_var_name(locale), data, document)
+            # Our own write must not look like an edit on the next tick.
+            self.signatures[document.path] = file_signature(document.path)
+        self.manifest.save()
+        return resolved, passes, sorted(changed_locales)
+
+    def champion(self, name: str) -> rp.ChampionResolver:
+        resolver = self.resolvers.get(self.names.get(name.lower(), name))
+        if resolver is None:
+            raise KeyError(f"Unknown champion '{name}'")
+        return resolver
+
+    def resolve(self, champion: str, ability: str, expr: str, locale: str = "en") -> str:
+        """Resolve one placeholder expression (with or without the {{ }}) for an ability."""
+        with self.lock:
+            if locale not in self.documents:
+                raise KeyError(f"Unknown locale '{locale}'")
+            resolver = self.champion(champion)
+            target = resolver.ability(ability.lower())
+            if target is None:
+                raise KeyError(f"Unknown ability '{ability}' for {resolver.name}")
+            match = rp.PLACEHOLDER_PATTERN.fullmatch(expr.strip())
+            name = match.group(1).strip() if match else expr.strip()
+            if name.lower() == "abilityresourcename":
+                return resolver.ability_resource(locale)
+            return rp.resolve_placeholder(name, locale, resolver, target)
+
+    def text_entry(self, champion: str, locale: str = "en") -> Dict[str, object]:
+        with self.lock:
+            if locale not in self.documents:
+                raise KeyError(f"Unknown locale '{locale}'")
+            name = self.champion(champion).name
+            entry = self.documents[locale][0].get(name)
+            if not isinstance(entry, dict):
+                raise KeyError(f"No {locale} text for {name}")
+            return entry
+
+    def status(self) -> Dict[str, object]:
+        with self.lock:
+            return {
+                "version": rp.read_data_version(),
+                "champions": len(self.resolvers),
+                "locales": list(self.documents),
+                "generation": self.generation,
+                "last": self.last,
+            }
+
+
+class BadRequest(ValueError):
+    """Raised when a query is missing a required parameter."""
+
+
+def required(params: Dict[str, str], key: str) -> str:
+    try:
+        return params[key]
+    except KeyError:
+        raise BadRequest(f"missing query parameter '{key}'") from None
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    server_version = "ResolveDaemon/1"
+
+    @property
+    def resolver(self) -> ResolverDaemon:
+        return self.server.resolver  # type: ignore[attr-defined]
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == "/resolve":
+                result = self.resolver.resolve(
+                    required(params, "champion"), required(params, "ability"), required(params, "expr"),
+                    params.get("locale", "en"),
+                )
+                self.reply(200, {"result": result})
+            elif url.path == "/champion":
+                self.reply(200, self.resolver.text_entry(required(params, "name"), params.get("locale", "en")))
+            elif url.path == "/status":
+                self.reply(200, self.resolver.status())
+            else:
+                self.reply(404, {"error": f"Unknown endpoint {url.path}"})
+        except BadRequest as err:
+            self.reply(400, {"error": str(err)})
+        except KeyError as err:
+            self.reply(404, {"error": str(err.args[0]) if err.args else str(err)})
+        except rp.SkipPlaceholder as err:
+            self.reply(422, {"error": str(err), "skipped": True})
+        except Exception as err:  # noqa: BLE001
+            self.reply(422, {"error": rp.failure_reason(err)})
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/refresh":
+            self.reply(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+        if not self.resolver.request_poll():
+            self.reply(504, {"error": "Timed out waiting for the rebuild"})
+            return
+        self.reply(200, self.resolver.status())
+
+    def reply(self, status: int, payload: object) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+
+def describe(summary: Dict[str, object]) -> str:
+    written = ", ".join(summary["written"]) or "nothing"
+    return (f"{summary['champions_resolved']} champions re-resolved ({summary['locale_passes']} locale passes, "
+            f"{summary['replaced']} placeholders) in {summary['seconds'] * 1000:.0f} ms; wrote {written}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="address to serve queries on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="seconds between file checks")
+    parser.add_argument("--locales", type=lambda value: [item.strip() for item in value.split(",") if item.strip()],
+                        default=None, metavar="LIST",
+                        help="comma-separated locales to keep resolved (default: every champion_text_<lang>.js)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    daemon = ResolverDaemon(args.locales)
+    rp.debug(f"Initial pass: {describe(daemon.poll(force=True))}")
+    server = ThreadingHTTPServer((args.host, args.port), QueryHandler)
+    server.resolver = daemon  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, name="resolve-http", daemon=True).start()
+    rp.debug(f"Serving {len(daemon.resolvers)} champions on http://{args.host}:{server.server_port}")
+    try:
+        while True:
+            daemon.wake.wait(args.interval)
+            daemon.wake.clear()
+            try:
+                summary = daemon.poll()
+            except Exception as err:  # noqa: BLE001
+                # A half-saved file parses badly; keep the old state until it is saved again.
+                rp.debug(f"Reload failed: {rp.failure_reason(err)}")
+                daemon._advance()
+                continue
+            if summary is not None:
+                rp.debug(f"{', '.join(summary['changed'])}: {describe(summary)}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,59 +2,78 @@
 """Resolve tooltip placeholders using Community Dragon data."""
 from __future__ import annotations
 
+import argparse
 import ast
+import contextlib
+import copy
+import cProfile
+import functools
+import gzip
+import hashlib
+import http.client
 import json
+import multiprocessing.util
+import operator
+import os
 import re
-from dataclasses import dataclass, field
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
-from urllib.request import urlopen
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import brotli
+except ImportError:  # optional: only needed for .br shard siblings
+    brotli = None
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 CACHE_DIR = BASE_DIR / "data" / "cdragon_cache"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
+TRANSLATIONS_DIR = BASE_DIR / "translations"
 
 BIN_URL = "https://raw.communitydragon.org/latest/game/data/characters/{alias}/{alias}.bin.json"
 
+FETCH_MAX_INFLIGHT = 8
+FETCH_RETRIES = 4
+FETCH_BACKOFF = 0.5
+FETCH_TIMEOUT = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+EXPRESSION_CACHE_SIZE = 4096
+CACHE_MANIFEST_NAME = "manifest.json"
+SPELL_STORE_PATH = CACHE_DIR / "spells.sqlite"
+SPELL_STORE_SCHEMA = "3"
+SPELL_RECORD_KEYS = ("DataValues", "mSpellCalculations")
+WORKING_PATCH = ""
+PATCHES_DIR = BASE_DIR / "data" / "patches"
+SOURCE_DIR = BASE_DIR / "data" / "champion"
+RESOURCE_TRANSLATIONS_PATH = BASE_DIR / "data" / "resource_translations.json"
+TEXT_FILE_PATTERN = re.compile(r"champion_text_([A-Za-z]+(?:_[A-Za-z]+)?)\.js")
+REPORT_PATH = BASE_DIR / "data" / "resolve_report.json"
+RESOLVE_MANIFEST_PATH = BASE_DIR / "data" / "resolve_manifest.json"
+SHARDS_DIR = TRANSLATIONS_DIR / "shards"
+SHARD_HASH_LENGTH = 12
+COMPACT_DIR = TRANSLATIONS_DIR / "compact"
+VERSION_FILE = BASE_DIR / "data" / "version.txt"
+
 PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([^{}]+?)\s*\}\}")
 TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_.]*")
+EFFECT_PATTERN = re.compile(r"(?:e|effect)(\d+)(?:amount)?(nl)?")
 
-RESOURCE_TRANSLATIONS = {
-    "en": {
-        "Mana": "Mana",
-        "Energy": "Energy",
-        "Fury": "Fury",
-        "Rage": "Rage",
-        "Bloodthirst": "Bloodthirst",
-        "Heat": "Heat",
-        "Shield": "Shield",
-        "Health": "Health",
-        "No Cost": "No Cost",
-        "None": "",
-        "Flow": "Flow",
-        "Grit": "Grit",
-        "Ferocity": "Ferocity",
-        "Courage": "Courage",
-        "Rage Power": "Rage Power",
-    },
-    "ru": {
-        "Mana": "Мана",
-        "Energy": "Энергия",
-        "Fury": "Ярость",
-        "Rage": "Ярость",
-        "Bloodthirst": "Жажда крови",
-        "Heat": "Перегрев",
-        "Shield": "Щит",
-        "Health": "Здоровье",
-        "No Cost": "Без затрат",
-        "None": "",
-        "Flow": "Поток",
-        "Grit": "Настойчивость",
-        "Ferocity": "Свирепость",
-        "Courage": "Отвага",
-        "Rage Power": "Сила гнева",
-    },
-}
+# Per-locale display names for a champion's partype; locales missing here fall back to English.
+RESOURCE_TRANSLATIONS: Dict[str, Dict[str, str]] = json.loads(RESOURCE_TRANSLATIONS_PATH.read_text(encoding="utf-8"))
 
 SPECIAL_EMPTY = {
     "spellmodifierdescriptionappend",
@@ -76,6 +95,31 @@ SCALING_LABEL_HINTS = {
     "crit": "Critical Strike",
 }
 
+CHAMPION_LEVELS = 18
+
+# mStat ids used by StatByCoefficient/StatBySubPart parts, as (total, base, bonus)
+# labels indexed by mStatFormula. Ids missing here are left unresolved.
+STAT_LABELS = {
+    0: ("AP", "base AP", "bonus AP"),
+    1: ("Armor", "base Armor", "bonus Armor"),
+    2: ("total AD", "base AD", "bonus AD"),
+    4: ("Attack Speed", "base Attack Speed", "bonus Attack Speed"),
+    6: ("Magic Resist", "base Magic Resist", "bonus Magic Resist"),
+    7: ("Move Speed", "base Move Speed", "bonus Move Speed"),
+    8: ("Critical Strike Chance", "Critical Strike Chance", "Critical Strike Chance"),
+    9: ("Critical Strike Damage", "Critical Strike Damage", "bonus Critical Strike Damage"),
+    12: ("max Health", "base Health", "bonus Health"),
+    14: ("current Health", "current Health", "current Health"),
+    16: ("missing Health", "missing Health", "missing Health"),
+    18: ("Life Steal", "Life Steal", "Life Steal"),
+    29: ("Lethality", "Lethality", "Lethality"),
+    31: ("Attack Range", "base Attack Range", "bonus Attack Range"),
+}
+# Crit chance and crit damage multiply a hit rather than add to it, so a part
+# that scales a sub part by them has no "(+x label)" form.
+CRIT_STATS = {8, 9}
+STACK_LABEL = "per stack"
+
 
 class LoadError(RuntimeError):
     """Raised when a JS payload cannot be parsed."""
@@ -85,92 +129,538 @@ class SkipPlaceholder(RuntimeError):
     """Raised when placeholder should be left unresolved."""
 
 
+class FetchError(RuntimeError):
+    """Raised when a Community Dragon file cannot be downloaded."""
+
+
 def debug(msg: str) -> None:
     print(msg)
 
 
-def find_assignment(text: str, var_name: str) -> Tuple[str, int, int]:
-    marker = f"window.{var_name}"
-    idx = text.find(marker)
-    if idx == -1:
-        raise LoadError(f"Variable {var_name} not found")
-    eq_idx = text.find("=", idx)
-    if eq_idx == -1:
-        raise LoadError(f"Assignment for {var_name} not found")
-    json_str, start, end = extract_json_block(text, eq_idx)
-    return json_str, start, end
-
-
-def extract_json_block(text: str, start_idx: int) -> Tuple[str, int, int]:
-    brace_start = text.find("{", start_idx)
-    if brace_start == -1:
-        raise LoadError("Opening brace not found")
-    depth = 0
-    in_string = False
-    escape = False
-    for pos in range(brace_start, len(text)):
-        ch = text[pos]
-        if in_string:
-            if escape:
-                escape = False
-            elif ch == "\\":
-                escape = True
-            elif ch == '"':
-                in_string = False
-        else:
-            if ch == '"':
-                in_string = True
-            elif ch == "{":
-                depth += 1
-            elif ch == "}":
-                depth -= 1
-                if depth == 0:
-                    return text[brace_start:pos + 1], brace_start, pos + 1
-    raise LoadError("JSON block not terminated")
-
-
-def load_js_object(path: Path, var_name: str) -> Tuple[Dict[str, object], str]:
-    text = path.read_text(encoding="utf-8")
-    payload, start, end = find_assignment(text, var_name)
-    data = json.loads(payload)
-    return data, text
+ASSIGNMENT_PATTERN = re.compile(r"window\.([A-Za-z_$][\w$]*)\s*=\s*")
+JS_STRING_PATTERN = re.compile(r"'((?:[^'\\\n]|\\.)*)'")
+# \uXXXX, \u{X...} and \xXX; the single-character escapes; anything else (octal, bad hex) is rejected.
+JS_ESCAPE_PATTERN = re.compile(r"\\(?:(u\{[0-9A-Fa-f]{1,6}\}|u[0-9A-Fa-f]{4}|x[0-9A-Fa-f]{2})|(0(?![0-9])|[^0-9xu])|(.))")
+JS_SINGLE_ESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v", "0": "\0"}
+_JSON_DECODER = json.JSONDecoder()
 
 
-def dump_js_object(path: Path, var_name: str, data: Dict[str, object], original_text: str) -> None:
-    payload, start, end = find_assignment(original_text, var_name)
-    new_payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
-    new_text = original_text[:start] + new_payload + original_text[end:]
-    path.write_text(new_text, encoding="utf-8")
+@dataclass
+class JsAssignment:
+    var_name: str
+    value: object
+    start: int
+    end: int
 
 
-def fetch_bin(alias: str) -> Dict[str, object]:
-    cache_file = CACHE_DIR / f"{alias}.bin.json"
-    if cache_file.exists():
-        return json.loads(cache_file.read_text(encoding="utf-8"))
-    url = BIN_URL.format(alias=alias)
-    with urlopen(url) as resp:  # noqa: S310
-        data = resp.read().decode("utf-8")
-    cache_file.write_text(data, encoding="utf-8")
-    return json.loads(data)
+@dataclass
+class JsDocument:
+    """A JS file of window.X = <payload> assignments, with each payload's offsets."""
 
+    path: Path
+    text: str
+    assignments: Dict[str, JsAssignment]
 
-def normalize_alias(name: str) -> str:
-    return re.sub(r"[^a-z0-9]", "", name.lower())
+    def __getitem__(self, var_name: str) -> JsAssignment:
+        try:
+            return self.assignments[var_name]
+        except KeyError:
+            raise LoadError(f"Variable {var_name} not found") from None
+
+    def render(self, updates: Dict[str, object]) -> str:
+        pieces: List[str] = []
+        pos = 0
+        for assignment in sorted((self[name] for name in updates), key=lambda a: a.start):
+            pieces.append(self.text[pos:assignment.start])
+            pieces.append(json.dumps(updates[assignment.var_name], ensure_ascii=False, separators=(",", ":")))
+            pos = assignment.end
+        pieces.append(self.text[pos:])
+        return "".join(pieces)
+
+
+def _js_escape(match: re.Match[str]) -> str:
+    code, single, invalid = match.groups()
+    if invalid is not None:
+        raise LoadError(f"Unsupported escape sequence \\{invalid} in JS string")
+    if single is not None:
+        return JS_SINGLE_ESCAPES.get(single, single)
+    point = int(code.strip("ux{}"), 16)
+    if point > sys.maxunicode:
+        raise LoadError(f"Code point \\{code} out of range in JS string")
+    return chr(point)
+
+
+def unescape_js_string(body: str) -> str:
+    """Decode the escapes of a JS string literal body; surrogate pairs are joined."""
+    if "\\" not in body:
+        return body
+    decoded = JS_ESCAPE_PATTERN.sub(_js_escape, body)
+    return decoded.encode("utf-16", "surrogatepass").decode("utf-16", "surrogatepass")
+
+
+def decode_js_value(text: str, idx: int) -> Tuple[object, int, int]:
+    """Decode the JSON (or single-quoted JS string) literal starting at idx."""
+    match = JS_STRING_PATTERN.match(text, idx)
+    if match:
+        return unescape_js_string(match.group(1)), idx, match.end()
+    try:
+        value, end = _JSON_DECODER.raw_decode(text, idx)
+    except json.JSONDecodeError as err:
+        raise LoadError(f"Invalid payload at offset {idx}: {err}") from err
+    return value, idx, end
+
+
+def parse_js_assignments(text: str) -> Dict[str, JsAssignment]:
+    assignments: Dict[str, JsAssignment] = {}
+    pos = 0
+    while True:
+        match = ASSIGNMENT_PATTERN.search(text, pos)
+        if not match:
+            return assignments
+        value, start, end = decode_js_value(text, match.end())
+        assignments[match.group(1)] = JsAssignment(match.group(1), value, start, end)
+        # Resume after the payload so text inside it is never mistaken for an assignment.
+        pos = end
+
+
+def load_js_document(path: Path) -> JsDocument:
+    text = path.read_text(encoding="utf-8")
+    return JsDocument(path, text, parse_js_assignments(text))
+
+
+def load_js_object(path: Path, var_name: str) -> Tuple[Dict[str, object], JsDocument]:
+    document = load_js_document(path)
+    return document[var_name].value, document
+
+
+def dump_js_object(path: Path, var_name: str, data: Dict[str, object], document: JsDocument) -> None:
+    path.write_text(document.render({var_name: data}), encoding="utf-8")
+
+
+def text_var_name(locale: str) -> str:
+    return f"LOL_CHAMPIONS_TEXT_{locale.upper()}"
+
+
+def discover_locales(directory: Path = TRANSLATIONS_DIR) -> Dict[str, Path]:
+    """Map every champion_text_<lang>.js in directory to its locale, English first."""
+    found = {}
+    for path in sorted(directory.glob("champion_text_*.js")):
+        match = TEXT_FILE_PATTERN.fullmatch(path.name)
+        if match:
+            found[match.group(1)] = path
+    return dict(sorted(found.items(), key=lambda item: (item[0] != "en", item[0])))
+
+
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def read_data_version() -> str:
+    if not VERSION_FILE.exists():
+        return ""
+    return VERSION_FILE.read_text(encoding="utf-8-sig").strip()
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        # mkstemp creates files as 0600; give them the mode a plain open() would.
+        os.chmod(tmp_name, 0o666 & ~_UMASK)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+class CacheManifest:
+    """Tracks which patch each cached bin was validated for, plus its HTTP validators."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self.dirty = False
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self.entries = dict(data.get("entries") or {})
+
+    def get(self, alias: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self.entries.get(alias) or {})
+
+    def update(self, alias: str, patch: str, headers: Optional[http.client.HTTPMessage] = None) -> None:
+        with self._lock:
+            entry = self.entries.setdefault(alias, {})
+            entry["patch"] = patch
+            if headers is not None:
+                for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+                    if headers.get(header):
+                        entry[key] = headers[header]
+            self.dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            payload = {"entries": {alias: self.entries[alias] for alias in sorted(self.entries)}}
+        write_atomic(self.path, json.dumps(payload, indent=1).encode("utf-8"))
+
+
+class BinFetcher:
+    """Downloads champion bin files with a bounded pool of keep-alive connections."""
+
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        url_template: str = BIN_URL,
+        max_inflight: int = FETCH_MAX_INFLIGHT,
+        retries: int = FETCH_RETRIES,
+        backoff: float = FETCH_BACKOFF,
+        timeout: float = FETCH_TIMEOUT,
+        patch: Optional[str] = None,
+    ):
+        self.cache_dir = cache_dir
+        self.url_template = url_template
+        self.max_inflight = max(1, max_inflight)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.timeout = timeout
+        self.patch = read_data_version() if patch is None else patch
+        self.manifest = CacheManifest(cache_dir / CACHE_MANIFEST_NAME)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[http.client.HTTPConnection] = []
+
+    def __enter__(self) -> "BinFetcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def cache_path(self, alias: str) -> Path:
+        return self.cache_dir / f"{alias}.bin.json"
+
+    def is_current(self, alias: str) -> bool:
+        if not self.cache_path(alias).exists():
+            return False
+        entry = self.manifest.get(alias)
+        if not entry:
+            # Files cached before the manifest existed are adopted as-is.
+            self.manifest.update(alias, self.patch)
+            return True
+        return entry.get("patch") == self.patch
+
+    def prefetch(self, aliases: Iterable[str]) -> Dict[str, Exception]:
+        """Bring every alias up to the current patch; return failures that left no usable file."""
+        stale = sorted({alias for alias in aliases if not self.is_current(alias)})
+        failures: Dict[str, Exception] = {}
+        for alias, result in self._run(stale).items():
+            if not isinstance(result, Exception):
+                continue
+            if self.cache_path(alias).exists():
+                debug(f"Revalidation failed for {alias}, keeping cached copy: {result}")
+            else:
+                failures[alias] = result
+        self.manifest.save()
+        return failures
+
+    def refresh(self, aliases: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        if aliases is None:
+            aliases = [path.name[: -len(".bin.json")] for path in self.cache_dir.glob("*.bin.json")]
+        results = self._run(sorted(set(aliases)))
+        summary = {"checked": len(results), "changed": 0, "unchanged": 0, "failed": 0}
+        for result in results.values():
+            if isinstance(result, Exception):
+                summary["failed"] += 1
+            elif result:
+                summary["changed"] += 1
+            else:
+                summary["unchanged"] += 1
+        return summary
+
+    def revalidate(self, alias: str) -> bool:
+        """Conditionally re-download one bin; return True when its content changed."""
+        cache_file = self.cache_path(alias)
+        headers: Dict[str, str] = {}
+        if cache_file.exists():
+            entry = self.manifest.get(alias)
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        status, body, resp_headers = self.download(alias, headers)
+        if status == 304:
+            self.manifest.update(alias, self.patch, resp_headers)
+            return False
+        changed = not cache_file.exists() or cache_file.read_bytes() != body
+        if changed:
+            write_atomic(cache_file, body)
+        self.manifest.update(alias, self.patch, resp_headers)
+        return changed
+
+    def download(self, alias: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes, http.client.HTTPMessage]:
+        url = self.url_template.format(alias=alias)
+        error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                status, body, resp_headers = self._request(url, headers or {})
+            except (OSError, http.client.HTTPException) as err:
+                self._drop_connection(url)
+                error = err
+                continue
+            if status in (200, 304):
+                return status, body, resp_headers
+            error = FetchError(f"HTTP {status} for {url}")
+            if status not in RETRY_STATUSES:
+                raise error
+        raise FetchError(f"Failed to download {url} after {self.retries + 1} attempts: {error}") from error
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    def _run(self, aliases: List[str]) -> Dict[str, object]:
+        results: Dict[str, object] = {}
+        if not aliases:
+            return results
+
+        def task(alias: str) -> None:
+            try:
+                results[alias] = self.revalidate(alias)
+            except Exception as err:  # noqa: BLE001
+                results[alias] = err
 
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_inflight, len(aliases))) as pool:
+                list(pool.map(task, aliases))
+        finally:
+            self.manifest.save()
+        return results
+
+    def _request(self, url: str, headers: Dict[str, str]) -> Tuple[int, bytes, http.client.HTTPMessage]:
+        parts = urlsplit(url)
+        conn = self._connection(parts.scheme, parts.netloc)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        conn.request("GET", target, headers={"Connection": "keep-alive", **headers})
+        resp = conn.getresponse()
+        body = resp.read()
+        if resp.will_close:
+            self._drop_connection(url)
+        return resp.status, body, resp.headers
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        pool = getattr(self._local, "connections", None)
+        if pool is None:
+            pool = self._local.connections = {}
+        conn = pool.get((scheme, netloc))
+        if conn is None:
+            conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conn_cls(netloc, timeout=self.timeout)
+            pool[(scheme, netloc)] = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _drop_connection(self, url: str) -> None:
+        parts = urlsplit(url)
+        pool = getattr(self._local, "connections", {})
+        conn = pool.pop((parts.scheme, parts.netloc), None)
+        if conn is not None:
+            conn.close()
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+
+
+def extract_spell_record(value: Dict[str, object]) -> Dict[str, object]:
+    # Keep only what AbilityResolver reads, but keep the record truthy whenever
+    # the raw entry was, so first-match lookups behave exactly as on the full bin.
+    if not value:
+        return {}
+    spell = value.get("mSpell")
+    if spell:
+        return {"mSpell": {key: spell[key] for key in SPELL_RECORD_KEYS if key in spell}}
+    record = {key: value[key] for key in SPELL_RECORD_KEYS if key in value}
+    return record or {"__type": value.get("__type")}
+
+
+def extract_spell_records(bin_data: Dict[str, object]) -> Dict[str, Dict[str, object]]:
+    return {
+        key: extract_spell_record(value)
+        for key, value in bin_data.items()
+        if isinstance(value, dict) and "/" in key
+    }
+
+
+class SpellStore:
+    """Content-addressed SQLite store of the spell records extracted from cached bins.
+
+    Each distinct record is stored once under its hash, each distinct ordered
+    set of records once under its digest, and a patch is only a map of
+    alias -> set digest. The working copy (what ``cache_dir`` holds now) is
+    the patch named ``WORKING_PATCH``; snapshot() pins it under a real patch
+    name, so keeping N patches costs about the size of the spells that changed.
+    """
+
+    def __init__(self, path: Path = SPELL_STORE_PATH, cache_dir: Path = CACHE_DIR, read_only: bool = False):
+        self.path = path
+        self.cache_dir = cache_dir
+        if read_only:
+            # Readers (the --jobs workers) never touch the schema, so they can share a live store.
+            self.conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            self.conn = sqlite3.connect(str(path))
+            self._ensure_schema()
+
+    def __enter__(self) -> "SpellStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _ensure_schema(self) -> None:
+        conn = self.conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if row and row[0] != SPELL_STORE_SCHEMA:
+            for table in ("sources", "spells", "records", "spell_sets", "patches"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute("CREATE TABLE IF NOT EXISTS sources (alias TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS records (hash TEXT PRIMARY KEY, record TEXT NOT NULL)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS spell_sets ("
+            "digest TEXT NOT NULL, ord INTEGER NOT NULL, path TEXT NOT NULL, hash TEXT NOT NULL, "
+            "PRIMARY KEY (digest, ord))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS patches ("
+            "patch TEXT NOT NULL, alias TEXT NOT NULL, digest TEXT NOT NULL, PRIMARY KEY (patch, alias))"
+        )
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)", (SPELL_STORE_SCHEMA,))
+        conn.commit()
+
+    def sync(self, aliases: Iterable[str]) -> int:
+        """Re-extract every alias whose bin file changed since it was stored."""
+        known = {
+            alias: (size, mtime_ns)
+            for alias, size, mtime_ns in self.conn.execute("SELECT alias, size, mtime_ns FROM sources")
+        }
+        rebuilt = 0
+        for alias in sorted(set(aliases)):
+            bin_file = self.cache_dir / f"{alias}.bin.json"
+            if not bin_file.exists():
+                continue
+            stat = bin_file.stat()
+            if known.get(alias) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            bin_data = json.loads(bin_file.read_text(encoding="utf-8"))
+            self.put(alias, extract_spell_records(bin_data), stat.st_size, stat.st_mtime_ns)
+            rebuilt += 1
+        if rebuilt:
+            self.prune()
+        return rebuilt
+
+    def put(
+        self,
+        alias: str,
+        records: Dict[str, Dict[str, object]],
+        size: int = 0,
+        mtime_ns: int = 0,
+        patch: str = WORKING_PATCH,
+    ) -> str:
+        """Store one alias's records under patch (default: the working copy); returns the set digest."""
+        rows = []
+        digest = hashlib.sha1()
+        for ord_, (path, record) in enumerate(records.items()):
+            payload = json.dumps(record, separators=(",", ":"))
+            rows.append((ord_, path, hashlib.sha1(payload.encode("utf-8")).hexdigest(), payload))
+            digest.update(f"{path}\n{payload}\n".encode("utf-8"))
+        set_digest = digest.hexdigest()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO records (hash, record) VALUES (?, ?)",
+                [(record_hash, payload) for _, _, record_hash, payload in rows],
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO spell_sets (digest, ord, path, hash) VALUES (?, ?, ?, ?)",
+                [(set_digest, ord_, path, record_hash) for ord_, path, record_hash, _ in rows],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO patches (patch, alias, digest) VALUES (?, ?, ?)", (patch, alias, set_digest)
+            )
+            if patch == WORKING_PATCH:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sources (alias, size, mtime_ns) VALUES (?, ?, ?)", (alias, size, mtime_ns)
+                )
+        return set_digest
+
+    def digest(self, alias: str, patch: str = WORKING_PATCH) -> Optional[str]:
+        row = self.conn.execute("SELECT digest FROM patches WHERE patch = ? AND alias = ?", (patch, alias)).fetchone()
+        return row[0] if row else None
+
+    def has(self, alias: str, patch: str = WORKING_PATCH) -> bool:
+        return self.digest(alias, patch) is not None
+
+    def load(self, alias: str, patch: str = WORKING_PATCH) -> Dict[str, Dict[str, object]]:
+        rows = self.conn.execute(
+            "SELECT s.path, r.record FROM patches p "
+            "JOIN spell_sets s ON s.digest = p.digest JOIN records r ON r.hash = s.hash "
+            "WHERE p.patch = ? AND p.alias = ? ORDER BY s.ord",
+            (patch, alias),
+        )
+        return {path: json.loads(record) for path, record in rows}
+
+    def snapshot(self, patch: str) -> bool:
+        """Pin the working copy as patch; returns False when it was already identical."""
+        current = dict(self.conn.execute("SELECT alias, digest FROM patches WHERE patch = ?", (WORKING_PATCH,)))
+        if not patch or current == dict(self.conn.execute("SELECT alias, digest FROM patches WHERE patch = ?", (patch,))):
+            return False
+        with self.conn:
+            self.conn.execute("DELETE FROM patches WHERE patch = ?", (patch,))
+            self.conn.executemany(
+                "INSERT INTO patches (patch, alias, digest) VALUES (?, ?, ?)",
+                [(patch, alias, digest) for alias, digest in current.items()],
+            )
+        self.prune()
+        return True
 
-def align_lists(a: List[float], b: List[float]) -> Tuple[List[float], List[float]]:
-    length = max(len(a), len(b))
+    def import_bins(self, patch: str, directory: Path) -> int:
+        """Store every <alias>.bin.json in directory as patch (e.g. an archived cache)."""
+        count = 0
+        for bin_file in sorted(directory.glob("*.bin.json")):
+            bin_data = json.loads(bin_file.read_text(encoding="utf-8"))
+            self.put(bin_file.name[: -len(".bin.json")], extract_spell_records(bin_data), patch=patch)
+            count += 1
+        self.prune()
+        return count
+
+    def patches(self) -> Dict[str, int]:
+        """Stored patch names (the working copy excluded) with their alias counts."""
+        rows = self.conn.execute(
+            "SELECT patch, COUNT(*) FROM patches WHERE patch != ? GROUP BY patch ORDER BY patch", (WORKING_PATCH,)
+        )
+        return dict(rows)
+
+    def prune(self) -> None:
+        """Drop sets and records no longer referenced by any patch."""
+        with self.conn:
+            self.conn.execute("DELETE FROM spell_sets WHERE digest NOT IN (SELECT digest FROM patches)")
+            self.conn.execute("DELETE FROM records WHERE hash NOT IN (SELECT hash FROM spell_sets)")
 
-    def expand(values: List[float]) -> List[float]:
-        if not values:
-            return [0.0] * length
-        if len(values) == length:
-            return values
-        if len(values) == 1:
-            return [values[0]] * length
-        return values + [values[-1]] * (length - len(values))
 
-    return expand(a), expand(b)
+def normalize_alias(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
 
 
 def list_to_slash(values: List[float]) -> str:
@@ -182,106 +672,163 @@ def list_to_slash(values: List[float]) -> str:
     return "/".join(formatted)
 
 
+def level_range(values: List[float]) -> str:
+    """Render a level 1-18 curve as "first–last" (or one number when flat)."""
+    if not values:
+        return "0"
+    first, last = format_number(values[0]), format_number(values[-1])
+    return first if first == last else f"{first}–{last}"
+
+
 def format_number(value: float) -> str:
     if abs(value - round(value)) < 1e-6:
         return str(int(round(value)))
     return f"{value:.3f}".rstrip("0").rstrip(".")
 
 
-@dataclass
+def _vector(values: Iterable[float]) -> array:
+    return array("d", values)
+
+
+def _pad(values: array, length: int) -> array:
+    """Broadcast a rank vector to length: empty means zeros, otherwise repeat the last rank."""
+    size = len(values)
+    if size == length:
+        return values
+    if not size:
+        return _vector(bytes(8 * length)) if length else values
+    return values + _vector((values[-1],)) * (length - size)
+
+
 class Value:
-    terms: Dict[str, List[float]] = field(default_factory=dict)
+    """Per-rank coefficients keyed by scaling label ("" is the flat base).
+
+    Instances are immutable and share their arrays, so arithmetic only
+    allocates vectors for the terms it actually changes. Values built from
+    champion-level curves set ``by_level``; their vectors run over levels
+    1-18 instead of ranks and cannot be mixed with per-rank vectors.
+    """
+
+    __slots__ = ("terms", "by_level")
+
+    def __init__(self, terms: Optional[Dict[str, array]] = None, by_level: bool = False):
+        self.terms: Dict[str, array] = {} if terms is None else terms
+        self.by_level = by_level
+
+    def __repr__(self) -> str:
+        suffix = ", by_level=True" if self.by_level else ""
+        return f"Value({ {label: list(coeffs) for label, coeffs in self.terms.items()} }{suffix})"
 
     @classmethod
     def from_numbers(cls, numbers: Iterable[float]) -> "Value":
-        return cls({"": [float(x) for x in numbers]})
+        return cls({"": _vector(float(x) for x in numbers)})
 
     @classmethod
     def from_scalar(cls, number: float) -> "Value":
-        return cls({"": [float(number)]})
+        return cls({"": _vector((float(number),))})
 
     @classmethod
     def from_scaling(cls, coeffs: Iterable[float], label: str) -> "Value":
-        return cls({label: [float(x) for x in coeffs]})
+        return cls({sys.intern(label): _vector(float(x) for x in coeffs)})
+
+    @classmethod
+    def from_levels(cls, numbers: Iterable[float]) -> "Value":
+        return cls({"": _vector(float(x) for x in numbers)}, by_level=True)
 
     def copy(self) -> "Value":
-        return Value({k: v[:] for k, v in self.terms.items()})
+        return Value(dict(self.terms), self.by_level)
+
+    def _axis(self, other: "Value") -> bool:
+        if self.by_level == other.by_level:
+            return self.by_level
+        per_rank = other if self.by_level else self
+        if per_rank.length() > 1:
+            raise ValueError("Cannot combine per-rank and per-level values")
+        return True
 
-    def ensure_length(self, length: int) -> None:
-        for key, values in list(self.terms.items()):
-            if not values:
-                self.terms[key] = [0.0] * length
-            elif len(values) == length:
+    def _combine(self, other: "Value", op) -> "Value":
+        by_level = self._axis(other)
+        terms = dict(self.terms)
+        for label, coeffs in other.terms.items():
+            mine = terms.get(label)
+            if mine is None:
+                terms[label] = coeffs if op is operator.add else _vector(-x for x in coeffs)
                 continue
-            elif len(values) == 1:
-                self.terms[key] = [values[0]] * length
-            else:
-                self.terms[key] = values + [values[-1]] * (length - len(values))
+            length = max(len(mine), len(coeffs))
+            terms[label] = _vector(map(op, _pad(mine, length), _pad(coeffs, length)))
+        return Value(terms, by_level)
 
     def merge(self, other: "Value") -> "Value":
-        out = self.copy()
-        for desc, coeffs in other.terms.items():
-            if desc in out.terms:
-                a, b = align_lists(out.terms[desc], coeffs)
-                out.terms[desc] = [x + y for x, y in zip(a, b)]
-            else:
-                out.terms[desc] = coeffs[:]
-        return out
+        return self._combine(other, operator.add)
 
     def add(self, other: "Value") -> "Value":
-        return self.merge(other)
+        return self._combine(other, operator.add)
 
     def sub(self, other: "Value") -> "Value":
-        neg = {k: [-x for x in v] for k, v in other.terms.items()}
-        return self.merge(Value(neg))
+        return self._combine(other, operator.sub)
+
+    def _scaled(self, scalar: float) -> "Value":
+        return Value({label: _vector(x * scalar for x in coeffs) for label, coeffs in self.terms.items()}, self.by_level)
+
+    def _scaled_by(self, factors: array, by_level: bool) -> "Value":
+        terms = {}
+        for label, coeffs in self.terms.items():
+            length = max(len(coeffs), len(factors))
+            terms[label] = _vector(map(operator.mul, _pad(coeffs, length), _pad(factors, length)))
+        return Value(terms, by_level)
 
     def mul(self, other: "Value") -> "Value":
         if other.is_scalar():
-            scalar = other.get_scalar()
-            return Value({k: [x * scalar for x in v] for k, v in self.terms.items()})
+            return self._scaled(other.get_scalar())
         if self.is_scalar():
-            scalar = self.get_scalar()
-            return Value({k: [x * scalar for x in v] for k, v in other.terms.items()})
+            return other._scaled(self.get_scalar())
+        if other.is_numeric():
+            return self._scaled_by(other.terms[""], self._axis(other))
+        if self.is_numeric():
+            return other._scaled_by(self.terms[""], self._axis(other))
         raise ValueError("Multiplication of non-scalar values is not supported")
 
     def truediv(self, other: "Value") -> "Value":
         if other.is_scalar():
             scalar = other.get_scalar()
-            return Value({k: [x / scalar for x in v] for k, v in self.terms.items()})
+            return Value({label: _vector(x / scalar for x in coeffs) for label, coeffs in self.terms.items()}, self.by_level)
         raise ValueError("Division by non-scalar values is not supported")
 
     def neg(self) -> "Value":
-        return Value({k: [-x for x in v] for k, v in self.terms.items()})
+        return Value({label: _vector(-x for x in coeffs) for label, coeffs in self.terms.items()}, self.by_level)
 
     def is_scalar(self) -> bool:
-        if len(self.terms) != 1:
-            return False
-        coeffs = next(iter(self.terms.values()))
-        return len(coeffs) == 1
+        """True for a single flat number; a lone scaling coefficient is not a scalar."""
+        return self.is_numeric() and len(self.terms[""]) == 1
+
+    def is_numeric(self) -> bool:
+        """True when the value has no scaling terms, only the flat base."""
+        return set(self.terms) == {""}
 
     def get_scalar(self) -> float:
         if not self.is_scalar():
             raise ValueError("Value is not scalar")
-        return next(iter(self.terms.values()))[0]
+        return self.terms[""][0]
 
     def length(self) -> int:
-        length = 0
-        for values in self.terms.values():
-            length = max(length, len(values))
-        return length or 1
+        return max(map(len, self.terms.values()), default=0) or 1
+
+    def base(self) -> array:
+        """The flat term broadcast to length() (zeros when the value only scales)."""
+        return _pad(self.terms.get("", _vector(())), self.length())
 
     def to_string(self) -> str:
         length = self.length()
-        self.ensure_length(length)
-        base = self.terms.get("", [0.0] * length)
-        result = list_to_slash(base)
+        render = level_range if self.by_level else list_to_slash
+        result = render(list(self.base()))
         extras: List[str] = []
         for desc, coeffs in self.terms.items():
             if not desc:
                 continue
+            coeffs = _pad(coeffs, length)
             if all(abs(x) < 1e-8 for x in coeffs):
                 continue
-            formatted = list_to_slash(coeffs)
+            formatted = render(list(coeffs))
             sign = "" if formatted.startswith("-") else "+"
             extras.append(f"({sign}{formatted} {desc})")
         if extras:
@@ -339,8 +886,14 @@ class AbilityResolver:
         self.cooldown = [float(x) for x in self.meta_spell.get("cooldown") or []]
         self.cost = [float(x) for x in self.meta_spell.get("cost") or []]
         self.range = [float(x) for x in self.meta_spell.get("range") or []]
+        self.maxrank = int(self.meta_spell.get("maxrank") or 0) or None
         self.data_values: Dict[str, List[float]] = {}
         self.calculations: Dict[str, Dict[str, object]] = {}
+        self.calculated: Dict[str, object] = {}
+        self._pending: Set[str] = set()
+        self.resolved: Dict[str, object] = {}
+        # spelling -> Value, calculation key or KeyError; filled on first use
+        self.symbols: Dict[str, object] = {}
         self._load_spell()
 
     def _load_spell(self) -> None:
@@ -351,19 +904,30 @@ class AbilityResolver:
             values = [float(x) for x in entry.get("mValues") or []]
             if not name:
                 continue
-            self.data_values[name.lower()] = values
+            self.data_values[name.lower()] = rank_values(values, self.maxrank)
         calculations = spell.get("mSpellCalculations") or {}
         for key, value in calculations.items():
             self.calculations[key.lower()] = value
 
     def get_value(self, name: str) -> Value:
+        symbol = self.symbols.get(name)
+        if symbol is None:
+            symbol = self.symbols[name] = self._lookup(name)
+        if isinstance(symbol, Value):
+            return symbol
+        if isinstance(symbol, str):
+            return self.calculation(symbol)
+        raise symbol
+
+    def _lookup(self, name: str) -> object:
+        """Classify a spelling: a Value, a calculation key, or the KeyError to raise."""
         name = name.strip()
         name_lower = name.lower()
 
         if name_lower in SPECIAL_EMPTY:
             return Value.from_scalar(0.0)
 
-        effect_match = re.match(r"(?:e|effect)(\d+)(?:amount)?(nl)?", name_lower)
+        effect_match = EFFECT_PATTERN.match(name_lower)
         if effect_match:
             index = int(effect_match.group(1))
             values = self._get_effect_values(index)
@@ -392,44 +956,131 @@ class AbilityResolver:
             return Value.from_numbers(self.data_values[camel.lower()])
 
         if name_lower in self.calculations:
-            return self._evaluate_calculation(self.calculations[name_lower])
+            return name_lower
         if camel.lower() in self.calculations:
-            return self._evaluate_calculation(self.calculations[camel.lower()])
+            return camel.lower()
 
         stats = self.champion.stats
         if camel in stats:
             return Value.from_numbers([float(stats[camel])])
 
-        raise KeyError(f"Unknown placeholder '{name}' for ability {self.name}")
+        return KeyError(f"Unknown placeholder '{name}' for ability {self.name}")
+
+    def calculation(self, key: str) -> Value:
+        """Evaluate a named calculation once; failures are remembered too.
+
+        Calculations reference data values and each other, so each ability's
+        table is walked as a graph: every node is computed at most once and a
+        node that is reached again while it is still being evaluated is a cycle.
+        """
+        result = self.calculated.get(key)
+        if result is None:
+            calc = self.calculations.get(key)
+            if calc is None:
+                raise KeyError(f"Unknown calculation '{key}' for ability {self.name}")
+            if key in self._pending:
+                raise ValueError(f"Calculation cycle through '{key}'")
+            self._pending.add(key)
+            try:
+                result = self._evaluate_game_calculation(calc)
+            except Exception as err:  # noqa: BLE001
+                result = err
+            finally:
+                self._pending.discard(key)
+            self.calculated[key] = result
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _evaluate_game_calculation(self, calc: Dict[str, object]) -> Value:
+        if calc.get("mDisplayAsPercent"):
+            # Value has no percent form, and "25 (+0.05 AP)" would read as a flat amount.
+            raise SkipPlaceholder("Percent calculation")
+        calc_type = calc.get("__type")
+        if calc_type == "GameCalculationModified":
+            value = self.calculation(str(calc.get("mModifiedGameCalculation", "")).lower())
+        elif calc_type == "GameCalculationConditional":
+            value = self.calculation(str(calc.get("mDefaultGameCalculation", "")).lower())
+        else:
+            value = self._evaluate_calculation(calc)
+        multiplier = calc.get("mMultiplier")
+        if isinstance(multiplier, dict):
+            value = value.mul(self._evaluate_part(multiplier))
+        return value
 
     def _evaluate_calculation(self, calc: Dict[str, object]) -> Value:
-        parts = calc.get("mFormulaParts") or []
         result = Value.from_scalar(0.0)
-        for part in parts:
-            part_type = part.get("__type")
-            if part_type == "NamedDataValueCalculationPart":
-                value = self.get_value(part.get("mDataValue", ""))
-            elif part_type == "StatByNamedDataValueCalculationPart":
-                coeffs = self.get_value(part.get("mDataValue", ""))
-                base_coeffs = coeffs.terms.get("", [0.0])
-                label = scaling_label(part.get("mDataValue", ""))
-                value = Value.from_scaling(base_coeffs, label)
-            elif part_type == "NumberCalculationPart":
-                value = Value.from_scalar(float(part.get("mNumber", 0.0)))
-            elif part_type == "ProductOfSubPartsCalculationPart":
-                left = self._evaluate_calculation(part.get("mPart1", {}))
-                right = self._evaluate_calculation(part.get("mPart2", {}))
-                value = left.mul(right)
-            elif part_type == "SumOfSubPartsCalculationPart":
-                subtotal = Value.from_scalar(0.0)
-                for sub in part.get("mSubparts", []) or []:
-                    subtotal = subtotal.add(self._evaluate_calculation(sub))
-                value = subtotal
-            else:
-                raise ValueError(f"Unsupported calculation part '{part_type}'")
-            result = result.add(value)
+        for part in calc.get("mFormulaParts") or []:
+            result = result.add(self._evaluate_part(part))
         return result
 
+    def _evaluate_part(self, part: Dict[str, object]) -> Value:
+        part_type = part.get("__type")
+        if part_type == "NamedDataValueCalculationPart":
+            return self.get_value(part.get("mDataValue", ""))
+        if part_type == "StatByNamedDataValueCalculationPart":
+            coeffs = self.get_value(part.get("mDataValue", ""))
+            base_coeffs = coeffs.terms.get("", [0.0])
+            label = scaling_label(part.get("mDataValue", ""))
+            return Value.from_scaling(base_coeffs, label)
+        if part_type == "NumberCalculationPart":
+            return Value.from_scalar(float(part.get("mNumber", 0.0)))
+        if part_type == "ProductOfSubPartsCalculationPart":
+            left = self._evaluate_part(part.get("mPart1", {}))
+            right = self._evaluate_part(part.get("mPart2", {}))
+            return left.mul(right)
+        if part_type == "SumOfSubPartsCalculationPart":
+            return self._sum_parts(part.get("mSubparts"))
+        if part_type == "StatByCoefficientCalculationPart":
+            return Value.from_scaling([float(part.get("mCoefficient", 0.0))], stat_label(part))
+        if part_type == "StatBySubPartCalculationPart":
+            if int(part.get("mStat", 0)) in CRIT_STATS:
+                raise SkipPlaceholder("Critical strike multiplier")
+            sub = self._evaluate_part(part.get("mSubpart", {}))
+            if not sub.is_numeric():
+                raise ValueError("Stat sub part must not scale with another stat")
+            return Value({sys.intern(stat_label(part)): sub.terms[""]}, sub.by_level)
+        if part_type == "EffectValueCalculationPart":
+            index = int(part.get("mEffectIndex", 0))
+            values = self._get_effect_values(index)
+            if not values:
+                raise KeyError(f"Unknown effect index {index} for ability {self.name}")
+            return Value.from_numbers(values)
+        if part_type == "ByCharLevelBreakpointsCalculationPart":
+            return Value.from_levels(level_breakpoints(part))
+        if part_type == "ByCharLevelInterpolationCalculationPart":
+            start = float(part.get("mStartValue", 0.0))
+            end = float(part.get("mEndValue", 0.0))
+            step = (end - start) / (CHAMPION_LEVELS - 1)
+            return Value.from_levels(start + step * level for level in range(CHAMPION_LEVELS))
+        if part_type == "ByCharLevelFormulaCalculationPart":
+            values = [float(x) for x in part.get("mValues") or []][:CHAMPION_LEVELS]
+            if not values:
+                raise ValueError("Level formula has no values")
+            return Value.from_levels(values)
+        if part_type == "ClampSubPartsCalculationPart":
+            total = self._sum_parts(part.get("mSubparts"))
+            if not total.is_numeric():
+                raise ValueError("Cannot clamp a value that scales with a stat")
+            floor = float(part.get("mFloor", float("-inf")))
+            ceiling = float(part.get("mCeiling", float("inf")))
+            return Value({"": _vector(min(max(x, floor), ceiling) for x in total.terms[""])}, total.by_level)
+        if part_type == "BuffCounterByCoefficientCalculationPart":
+            return Value.from_scaling([float(part.get("mCoefficient", 0.0))], STACK_LABEL)
+        if part_type == "BuffCounterByNamedDataValueCalculationPart":
+            coeffs = self.get_value(part.get("mDataValue", ""))
+            return Value.from_scaling(coeffs.terms.get("", [0.0]), STACK_LABEL)
+        if part_type == "AbilityResourceByCoefficientCalculationPart":
+            label = f"max {self.champion.ability_resource('en')}"
+            return Value.from_scaling([float(part.get("mCoefficient", 0.0))], label)
+        raise ValueError(f"Unsupported calculation part '{part_type}'")
+
+    def _sum_parts(self, parts: Optional[List[Dict[str, object]]]) -> Value:
+        total = Value.from_scalar(0.0)
+        for sub in parts or []:
+            total = total.add(self._evaluate_part(sub))
+        return total
+
     def _get_effect_values(self, index: int) -> List[float]:
         if index < len(self.effect):
             raw = self.effect[index]
@@ -444,11 +1095,21 @@ class AbilityResolver:
         return []
 
 
+def build_spell_index(bin_data: Dict[str, object]) -> Dict[str, Dict[str, object]]:
+    """Map the lowercased last path segment of each bin entry to the first entry carrying it."""
+    index: Dict[str, Dict[str, object]] = {}
+    for key, value in bin_data.items():
+        if isinstance(value, dict) and "/" in key:
+            index.setdefault(key.rsplit("/", 1)[1].lower(), value)
+    return index
+
+
 class ChampionResolver:
     def __init__(self, name: str, meta: Dict[str, object], bin_data: Dict[str, object], en_entry: Dict[str, object]):
         self.name = name
         self.meta = meta
         self.bin_data = bin_data
+        self.spell_index = build_spell_index(bin_data)
         self.en_entry = en_entry
         self.stats = {to_camel_case(k): v for k, v in (meta.get("stats") or {}).items()}
         self.alias = normalize_alias(meta.get("id", name))
@@ -483,30 +1144,39 @@ class ChampionResolver:
     def _resolve_spell(self, script_name: Optional[str]) -> Optional[Dict[str, object]]:
         if not script_name:
             return None
-        target = script_name.lower()
-        for key, value in self.bin_data.items():
-            if not isinstance(value, dict):
-                continue
-            if key.lower().endswith(f"/{target}"):
-                return value
-        return None
+        return self.spell_index.get(script_name.lower())
+
+    def spell_objects(self) -> Dict[str, Dict[str, object]]:
+        """Every spell object in the bin (entries carrying mSpell), keyed by lowercased script name."""
+        return {key: value for key, value in self.spell_index.items() if value.get("mSpell")}
+
+    def ability(self, key: str) -> Optional[AbilityResolver]:
+        """Return the ability registered under key, falling back to any spell object in the bin."""
+        resolver = self.abilities.get(key)
+        if resolver is None:
+            spell_data = self._resolve_spell(key)
+            if spell_data:
+                resolver = AbilityResolver(self, key, None, spell_data)
+                self.abilities[key] = resolver
+        return resolver
 
-    def resolve_locale(self, locale: str, entry: Dict[str, object], stats: Optional[Dict[str, object]]) -> None:
+    def resolve_locale(self, locale: str, entry: Dict[str, object], metrics: Optional[RunMetrics]) -> None:
         spells = entry.get("spells")
         if isinstance(spells, list):
             for idx, spell in enumerate(spells):
-                ability = self._ability_by_index(idx)
-                spells[idx] = replace_placeholders(spell, locale, self, ability, stats)
+                ability = self.ability_at(idx)
+                spells[idx] = replace_placeholders(spell, locale, self, ability, metrics)
         if "passive" in entry:
             ability = self.abilities.get("passive")
             if ability:
-                entry["passive"] = replace_placeholders(entry["passive"], locale, self, ability, stats)
+                entry["passive"] = replace_placeholders(entry["passive"], locale, self, ability, metrics)
         for key, value in list(entry.items()):
             if key in {"spells", "passive"}:
                 continue
-            entry[key] = replace_placeholders(value, locale, self, None, stats)
+            entry[key] = replace_placeholders(value, locale, self, None, metrics)
 
-    def _ability_by_index(self, idx: int) -> Optional[AbilityResolver]:
+    def ability_at(self, idx: int) -> Optional[AbilityResolver]:
+        """The ability in spell slot idx (0-3 for Q/W/E/R), or None when the bin has no data for it."""
         spells = self.meta.get("spells") or []
         if idx < len(spells):
             spell_id = spells[idx].get("id") or ""
@@ -528,6 +1198,38 @@ class ChampionResolver:
         return translated
 
 
+def stat_label(part: Dict[str, object]) -> str:
+    stat = int(part.get("mStat", 0))
+    labels = STAT_LABELS.get(stat)
+    if labels is None:
+        raise SkipPlaceholder(f"Unknown stat id {stat}")
+    formula = int(part.get("mStatFormula", 0))
+    return labels[formula] if 0 <= formula < len(labels) else labels[0]
+
+
+def level_breakpoints(part: Dict[str, object]) -> List[float]:
+    """Expand a ByCharLevelBreakpoints part into its values at levels 1-18."""
+    value = float(part.get("mLevel1Value", 0.0))
+    per_level = float(part.get("mInitialBonusPerLevel", 0.0))
+    breakpoints = {int(bp.get("mLevel", 0)): bp for bp in part.get("mBreakpoints") or [] if isinstance(bp, dict)}
+    values = [value]
+    for level in range(2, CHAMPION_LEVELS + 1):
+        bp = breakpoints.get(level)
+        if bp:
+            per_level = float(bp.get("mBonusPerLevelAtAndAfter", per_level))
+            value += float(bp.get("mAdditionalBonusAtThisLevel", 0.0))
+        value += per_level
+        values.append(value)
+    return values
+
+
+def rank_values(values: List[float], maxrank: Optional[int]) -> List[float]:
+    """Cut a bin vector (ranks 0..6) down to ranks 1..maxrank; shorter vectors are already per rank."""
+    if maxrank and len(values) > maxrank:
+        return values[1:maxrank + 1]
+    return values
+
+
 def shift_next(values: List[float]) -> List[float]:
     if not values:
         return []
@@ -586,11 +1288,99 @@ def is_simple_expression(node: ast.AST) -> bool:
     return False
 
 
-def replace_placeholders(obj, locale: str, champion: ChampionResolver, ability: Optional[AbilityResolver], stats: Optional[Dict[str, object]] = None):
+class RunMetrics:
+    """Stage timings, per-champion cost and placeholder outcomes for one run.
+
+    Only plain containers are stored so worker processes can return their
+    metrics to the parent, which folds them in with merge().
+    """
+
+    OUTCOMES = ("replaced", "skipped", "errored")
+
+    def __init__(self) -> None:
+        self.counters: Dict[str, int] = {}
+        self.stages: Dict[str, float] = {}
+        self.champions: Dict[str, float] = {}
+        self.expressions: Dict[str, float] = {}
+        self.reasons: Dict[str, Dict[str, int]] = {outcome: {} for outcome in self.OUTCOMES}
+        self.placeholders: Dict[str, Dict[str, int]] = {outcome: {} for outcome in self.OUTCOMES}
+        self.errors: List[Tuple[str, str, str, str]] = []
+
+    def count(self, key: str, amount: int = 1) -> None:
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def add_time(self, table: Dict[str, float], key: str, seconds: float) -> None:
+        table[key] = table.get(key, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(self.stages, name, time.perf_counter() - start)
+
+    def outcome(self, outcome: str, name: str, reason: Optional[str] = None) -> None:
+        self.count(outcome)
+        by_name = self.placeholders[outcome]
+        key = name.lower()
+        by_name[key] = by_name.get(key, 0) + 1
+        if reason is not None:
+            by_reason = self.reasons[outcome]
+            by_reason[reason] = by_reason.get(reason, 0) + 1
+
+    def merge(self, other: "RunMetrics") -> None:
+        for key, value in other.counters.items():
+            self.count(key, value)
+        for table, part in ((self.stages, other.stages), (self.champions, other.champions),
+                            (self.expressions, other.expressions)):
+            for key, seconds in part.items():
+                self.add_time(table, key, seconds)
+        for outcome in self.OUTCOMES:
+            for mine, theirs in ((self.reasons[outcome], other.reasons[outcome]),
+                                 (self.placeholders[outcome], other.placeholders[outcome])):
+                for key, value in theirs.items():
+                    mine[key] = mine.get(key, 0) + value
+        self.errors.extend(other.errors)
+
+    def top(self, table: Dict[str, float], limit: int) -> List[Tuple[str, float]]:
+        return sorted(table.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def report(self, **extra: object) -> Dict[str, object]:
+        def ranked(table: Dict[str, object]) -> Dict[str, object]:
+            return dict(sorted(table.items(), key=lambda item: (-item[1], item[0])))
+
+        return {
+            **extra,
+            "counters": dict(sorted(self.counters.items())),
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "champions": {name: round(seconds, 6) for name, seconds in ranked(self.champions).items()},
+            "expressions": {name: round(seconds, 6) for name, seconds in self.top(self.expressions, 200)},
+            "reasons": {outcome: ranked(table) for outcome, table in self.reasons.items()},
+            "placeholders": {outcome: ranked(table) for outcome, table in self.placeholders.items()},
+            "errors": [
+                {"champion": champion, "ability": ability, "placeholder": name, "error": message}
+                for champion, ability, name, message in self.errors
+            ],
+        }
+
+
+QUOTED_PATTERN = re.compile(r"'[^']*'")
+
+
+def failure_reason(err: Exception) -> str:
+    """Group key for a failed placeholder; names are elided unless they identify the cause."""
+    message = str(err.args[0]) if err.args else str(err)
+    if isinstance(err, KeyError):
+        message = QUOTED_PATTERN.sub("'*'", message.split(" for ability ", 1)[0])
+    return f"{type(err).__name__}: {message}"
+
+
+def replace_placeholders(obj, locale: str, champion: ChampionResolver, ability: Optional[AbilityResolver], metrics: Optional[RunMetrics] = None):
     if isinstance(obj, dict):
-        return {k: replace_placeholders(v, locale, champion, ability, stats) for k, v in obj.items()}
+        return {k: replace_placeholders(v, locale, champion, ability, metrics) for k, v in obj.items()}
     if isinstance(obj, list):
-        return [replace_placeholders(v, locale, champion, ability, stats) for v in obj]
+        return [replace_placeholders(v, locale, champion, ability, metrics) for v in obj]
     if isinstance(obj, str):
         def repl(match: re.Match[str]) -> str:
             name = match.group(1).strip()
@@ -598,28 +1388,86 @@ def replace_placeholders(obj, locale: str, champion: ChampionResolver, ability:
                 if name.lower() == "abilityresourcename":
                     return champion.ability_resource(locale)
                 if ability is None:
-                    if stats is not None:
-                        stats["skipped"] = stats.get("skipped", 0) + 1
+                    if metrics is not None:
+                        metrics.outcome("skipped", name, "No ability context")
                     return match.group(0)
-                result = resolve_placeholder(name, locale, champion, ability)
-                if stats is not None:
-                    stats["replaced"] = stats.get("replaced", 0) + 1
+                result = resolve_placeholder(name, locale, champion, ability, metrics)
+                if metrics is not None:
+                    metrics.outcome("replaced", name)
                 return result
-            except SkipPlaceholder:
-                if stats is not None:
-                    stats["skipped"] = stats.get("skipped", 0) + 1
+            except SkipPlaceholder as err:
+                if metrics is not None:
+                    metrics.outcome("skipped", name, str(err))
                 return match.group(0)
             except Exception as err:  # noqa: BLE001
-                debug(f"[{champion.name}] unresolved placeholder '{name}' in ability {ability.name if ability else 'global'}: {err}")
-                if stats is not None:
-                    stats.setdefault("errors", []).append((champion.name, ability.name if ability else "global", name, str(err)))
-                    stats["skipped"] = stats.get("skipped", 0) + 1
+                if metrics is not None:
+                    metrics.outcome("errored", name, failure_reason(err))
+                    metrics.errors.append((champion.name, ability.name if ability else "global", name, str(err)))
                 return match.group(0)
         return PLACEHOLDER_PATTERN.sub(repl, obj)
     return obj
 
 
-def resolve_placeholder(name: str, locale: str, champion: ChampionResolver, ability: AbilityResolver) -> str:
+@dataclass(frozen=True)
+class CompiledExpression:
+    body: Optional[ast.expr]
+    name_map: Dict[str, str]
+    error: Optional[Exception] = None
+
+    def evaluate(self, ability: AbilityResolver) -> Value:
+        if self.error is not None:
+            raise self.error
+        return PlaceholderEvaluator(ability, self.name_map).visit(self.body)
+
+
+@functools.lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(expr: str) -> CompiledExpression:
+    processed, name_map = preprocess_expression(expr)
+    try:
+        tree = ast.parse(processed, mode="eval")
+    except SyntaxError as err:
+        return CompiledExpression(None, name_map, err)
+    if not is_simple_expression(tree.body) or count_names(tree.body) != 1:
+        return CompiledExpression(None, name_map, SkipPlaceholder("Expression requires complex calculation"))
+    return CompiledExpression(tree.body, name_map)
+
+
+def resolve_placeholder(
+    name: str,
+    locale: str,
+    champion: ChampionResolver,
+    ability: AbilityResolver,
+    metrics: Optional[RunMetrics] = None,
+) -> str:
+    # Results do not depend on the locale, so every later mention of the same
+    # expression in this ability (and in every other locale) is a dict hit.
+    result = ability.resolved.get(name)
+    if result is None:
+        start = time.perf_counter()
+        try:
+            result = _resolve_uncached(name, locale, champion, ability, metrics)
+        except Exception as err:  # noqa: BLE001
+            result = err
+        ability.resolved[name] = result
+        if metrics is not None:
+            metrics.add_time(metrics.expressions, name.lower(), time.perf_counter() - start)
+        counter = "memo_misses"
+    else:
+        counter = "memo_hits"
+    if metrics is not None:
+        metrics.count(counter)
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def _resolve_uncached(
+    name: str,
+    locale: str,
+    champion: ChampionResolver,
+    ability: AbilityResolver,
+    metrics: Optional[RunMetrics],
+) -> str:
     if name.lower().startswith("spell."):
         target, value = name.split(":", 1)
         raw = target.split(".", 1)[1]
@@ -633,52 +1481,657 @@ def resolve_placeholder(name: str, locale: str, champion: ChampionResolver, abil
             other = champion.abilities.get(key)
             if other:
                 break
+        else:
+            other = champion.ability(raw.lower())
         if not other:
             raise KeyError(f"Unknown spell reference '{raw}'")
-        return resolve_placeholder(value, locale, champion, other)
-
-    processed, name_map = preprocess_expression(name)
-    tree = ast.parse(processed, mode="eval")
-    if not is_simple_expression(tree.body) or count_names(tree.body) != 1:
-        raise SkipPlaceholder("Expression requires complex calculation")
-    evaluator = PlaceholderEvaluator(ability, name_map)
-    value = evaluator.visit(tree.body)
-    return value.to_string()
+        return resolve_placeholder(value, locale, champion, other, metrics)
 
+    return compile_expression(name).evaluate(ability).to_string()
 
-def main() -> None:
-    meta, meta_text = load_js_object(BASE_DIR / "champion_meta.js", "LOL_CHAMPIONS_META")
-    en_text, en_original = load_js_object(BASE_DIR / "champion_text_en.js", "LOL_CHAMPIONS_TEXT_EN")
-    ru_text, ru_original = load_js_object(BASE_DIR / "champion_text_ru.js", "LOL_CHAMPIONS_TEXT_RU")
 
-    champions: Dict[str, ChampionResolver] = {}
+def available_champions(
+    meta: Dict[str, Dict[str, object]],
+    aliases: Dict[str, str],
+    store: SpellStore,
+    failures: Dict[str, Exception],
+) -> Iterable[Tuple[str, Dict[str, object], str]]:
     for name, meta_entry in meta.items():
-        alias = normalize_alias(meta_entry.get("id", name))
-        try:
-            bin_data = fetch_bin(alias)
-        except Exception as err:  # noqa: BLE001
-            debug(f"Failed to fetch bin for {name}: {err}")
+        alias = aliases[name]
+        if alias in failures or not store.has(alias):
+            debug(f"Failed to fetch bin for {name}: {failures.get(alias, 'not cached')}")
             continue
-        en_entry = en_text.get(name, {})
-        champions[name] = ChampionResolver(name, meta_entry, bin_data, en_entry)
-
-    stats: Dict[str, object] = {}
-    for locale, data in (("en", en_text), ("ru", ru_text)):
-        for name, champion in champions.items():
-            entry = data.get(name)
-            if isinstance(entry, dict):
-                champion.resolve_locale(locale, entry, stats)
-
-    dump_js_object(BASE_DIR / "champion_text_en.js", "LOL_CHAMPIONS_TEXT_EN", en_text, en_original)
-    dump_js_object(BASE_DIR / "champion_text_ru.js", "LOL_CHAMPIONS_TEXT_RU", ru_text, ru_original)
-
-    replaced = int(stats.get("replaced", 0))
-    skipped = int(stats.get("skipped", 0))
-    debug(f"Placeholders replaced: {replaced}")
-    debug(f"Placeholders skipped : {skipped}")
-    unresolved = stats.get("errors")
-    if unresolved:
-        debug(f"Unresolved placeholders logged: {len(unresolved)}")
+        yield name, meta_entry, alias
+
+
+def iter_champions(
+    champions: Iterable[Tuple[str, Dict[str, object], str]],
+    store: SpellStore,
+    en_text: Dict[str, object],
+) -> Iterable[Tuple[str, ChampionResolver]]:
+    """Yield one resolver at a time so only a single champion's spell data is live."""
+    for name, meta_entry, alias in champions:
+        yield name, ChampionResolver(name, meta_entry, store.load(alias), en_text.get(name, {}))
+
+
+def resolve_champion(
+    champion: ChampionResolver,
+    texts: Sequence[Tuple[str, Dict[str, object]]],
+    metrics: RunMetrics,
+) -> None:
+    before = compile_expression.cache_info()
+    for locale, data in texts:
+        entry = data.get(champion.name)
+        if isinstance(entry, dict):
+            start = time.perf_counter()
+            champion.resolve_locale(locale, entry, metrics)
+            elapsed = time.perf_counter() - start
+            metrics.add_time(metrics.stages, f"resolve.{locale}", elapsed)
+            metrics.add_time(metrics.champions, champion.name, elapsed)
+    after = compile_expression.cache_info()
+    metrics.count("compile_hits", after.hits - before.hits)
+    metrics.count("compile_misses", after.misses - before.misses)
+
+
+_worker_store: Optional[SpellStore] = None
+
+
+def _init_worker(store_path: str) -> None:
+    global _worker_store
+    _worker_store = SpellStore(Path(store_path), read_only=True)
+    # Pool workers leave through multiprocessing's exit hooks, not atexit.
+    multiprocessing.util.Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker() -> None:
+    global _worker_store
+    if _worker_store is not None:
+        _worker_store.close()
+        _worker_store = None
+
+
+def _resolve_job(
+    job: Tuple[str, Dict[str, object], str, Dict[str, object], Dict[str, Dict[str, object]]],
+) -> Tuple[str, Dict[str, Dict[str, object]], RunMetrics]:
+    name, meta_entry, alias, en_entry, entries = job
+    texts = [(locale, {name: entry}) for locale, entry in entries.items()]
+    champion = ChampionResolver(name, meta_entry, _worker_store.load(alias), en_entry)
+    metrics = RunMetrics()
+    resolve_champion(champion, texts, metrics)
+    return name, {locale: data[name] for locale, data in texts}, metrics
+
+
+def resolve_parallel(
+    jobs: int,
+    store: SpellStore,
+    champions: Iterable[Tuple[str, Dict[str, object], str]],
+    texts: Sequence[Tuple[str, Dict[str, object]]],
+    metrics: RunMetrics,
+    locales: Optional[Dict[str, Sequence[str]]] = None,
+    en_text: Optional[Dict[str, object]] = None,
+) -> None:
+    """Resolve champions in a process pool; results are merged in roster order.
+
+    ``locales`` limits each champion to the listed locales (default: all).
+    """
+    by_locale = dict(texts)
+    if en_text is None:
+        en_text = by_locale.get("en", {})
+    work = [
+        (name, meta_entry, alias, en_text.get(name, {}), {
+            locale: data[name] for locale, data in texts
+            if isinstance(data.get(name), dict) and (locales is None or locale in locales[name])
+        })
+        for name, meta_entry, alias in champions
+    ]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(str(store.path),)) as pool:
+        for name, entries, part in pool.map(_resolve_job, work, chunksize=4):
+            for locale, entry in entries.items():
+                by_locale[locale][name] = entry
+            metrics.merge(part)
+
+
+def source_entry(entry: Dict[str, object], champion_id: str, locale: str, source_dir: Path = SOURCE_DIR) -> Optional[Dict[str, object]]:
+    """Copy of a text entry with its spell and passive text restored from <id>_<locale>.json.
+
+    The in-place text files have their placeholders replaced after every run;
+    the Data Dragon files they were built from still carry them. Returns None
+    when there is no source file for the champion and locale.
+    """
+    path = source_dir / f"{champion_id}_{locale}.json"
+    if not path.exists():
+        return None
+    data = json.loads(path.read_text(encoding="utf-8")).get("data") or {}
+    source = data.get(champion_id) or next(iter(data.values()), {})
+    restored = copy.deepcopy(entry)
+    pairs = list(zip(restored.get("spells") or [], source.get("spells") or []))
+    pairs.append((restored.get("passive"), source.get("passive")))
+    for target, original in pairs:
+        if isinstance(target, dict) and isinstance(original, dict):
+            for key in target:
+                if key in original:
+                    target[key] = copy.deepcopy(original[key])
+    return restored
+
+
+def resolve_patches(
+    patches: Sequence[str],
+    store: SpellStore,
+    meta: Dict[str, Dict[str, object]],
+    aliases: Dict[str, str],
+    documents: Dict[str, Tuple[Dict[str, object], JsDocument]],
+    en_text: Dict[str, object],
+    metrics: RunMetrics,
+    out_dir: Path = PATCHES_DIR,
+) -> Dict[str, int]:
+    """Resolve every locale against each stored patch into out_dir/<patch>/.
+
+    Spell and passive text starts from the unresolved source_entry(), since
+    the in-place files already carry the current patch's numbers; the meta
+    and the rest of each entry are the current ones. A champion whose spell
+    set is identical in several patches is resolved once and its entries are
+    reused for the others.
+    """
+    sources: Dict[str, Dict[str, object]] = {}
+    for locale, (data, _) in documents.items():
+        sources[locale] = {}
+        missing = []
+        for name, meta_entry in meta.items():
+            if isinstance(data.get(name), dict):
+                entry = source_entry(data[name], meta_entry.get("id", name), locale)
+                if entry is None:
+                    missing.append(name)
+                    entry = data[name]
+                sources[locale][name] = entry
+        if missing:
+            debug(f"WARNING: no {SOURCE_DIR.relative_to(BASE_DIR).as_posix()}/<id>_{locale}.json for {len(missing)} champions "
+                  f"({', '.join(missing[:5])}{', ...' if len(missing) > 5 else ''}); their {locale} text is "
+                  f"already resolved, so every patch keeps the current numbers there")
+    shared: Dict[Tuple[str, str, str], object] = {}
+    resolved = passes = total = 0
+    for patch in patches:
+        stored = reused = 0
+        outputs = {locale: dict(data) for locale, (data, _) in documents.items()}
+        for name, meta_entry in meta.items():
+            digest = store.digest(aliases[name], patch)
+            if digest is None:
+                continue
+            stored += 1
+            pending = [
+                (locale, {name: copy.deepcopy(entries[name])})
+                for locale, entries in sources.items()
+                if name in entries and (name, digest, locale) not in shared
+            ]
+            if pending:
+                champion = ChampionResolver(name, meta_entry, store.load(aliases[name], patch), en_text.get(name, {}))
+                resolve_champion(champion, pending, metrics)
+                shared.update(((name, digest, locale), part[name]) for locale, part in pending)
+                resolved += 1
+                passes += len(pending)
+            else:
+                reused += 1
+            for locale, output in outputs.items():
+                if (name, digest, locale) in shared:
+                    output[name] = shared[(name, digest, locale)]
+        total += stored
+        target = out_dir / patch
+        target.mkdir(parents=True, exist_ok=True)
+        for locale, (_, document) in documents.items():
+            dump_js_object(target / document.path.name, text_var_name(locale), outputs[locale], document)
+        debug(f"Patch {patch:<16}: {stored} champions ({reused} shared with an earlier patch) -> {target}")
+    return {
+        "champions_resolved": resolved,
+        "champions_total": total,
+        "locale_passes": passes,
+        "locales": len(documents),
+    }
+
+
+def content_hash(obj: object) -> str:
+    payload = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def resolver_fingerprint() -> str:
+    return hashlib.sha1(Path(__file__).read_bytes()).hexdigest()
+
+
+class ResolveManifest:
+    """Content hashes of every input that went into each champion's resolved text.
+
+    Text hashes are taken from the resolved output, so a champion stays clean
+    until its meta entry, spell records or text entry change (or the resolver
+    itself does).
+    """
+
+    def __init__(self, path: Path = RESOLVE_MANIFEST_PATH, resolver: str = ""):
+        self.path = path
+        self.resolver = resolver
+        self.champions: Dict[str, Dict[str, object]] = {}
+        self.dirty = False
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("resolver") == resolver:
+                self.champions = dict(data.get("champions") or {})
+
+    @staticmethod
+    def fingerprint(
+        name: str,
+        meta_entry: Dict[str, object],
+        spell_digest: Optional[str],
+        texts: Sequence[Tuple[str, Dict[str, object]]],
+    ) -> Dict[str, object]:
+        return {
+            "meta": content_hash(meta_entry),
+            "spells": spell_digest,
+            "text": {locale: content_hash(data.get(name)) for locale, data in texts},
+        }
+
+    def stale_locales(self, name: str, fingerprint: Dict[str, object]) -> List[str]:
+        """Locales to re-resolve: all of them if the spell inputs changed, else only edited texts."""
+        previous = self.champions.get(name)
+        texts = fingerprint["text"]
+        if not previous or any(previous.get(key) != fingerprint[key] for key in ("meta", "spells")):
+            return list(texts)
+        old_texts = previous.get("text") or {}
+        return [locale for locale, digest in texts.items() if old_texts.get(locale) != digest]
+
+    def record(self, name: str, fingerprint: Dict[str, object]) -> None:
+        previous = self.champions.get(name)
+        if previous and all(previous.get(key) == fingerprint[key] for key in ("meta", "spells")):
+            # Locales left out of this run stay valid while the spell inputs are unchanged.
+            fingerprint = {**fingerprint, "text": {**(previous.get("text") or {}), **fingerprint["text"]}}
+        if previous != fingerprint:
+            self.champions[name] = fingerprint
+            self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        payload = {
+            "resolver": self.resolver,
+            "champions": {name: self.champions[name] for name in sorted(self.champions)},
+        }
+        write_atomic(self.path, json.dumps(payload, indent=1, ensure_ascii=False).encode("utf-8"))
+        self.dirty = False
+
+
+def write_shards(locale: str, data: Dict[str, object], out_dir: Path = SHARDS_DIR) -> Dict[str, int]:
+    """Write one content-hashed JSON file per champion plus .gz/.br siblings and a manifest.
+
+    Shards are immutable: a champion whose text did not change keeps its file
+    name, so clients can cache it across patches. Unreferenced shards are removed.
+    """
+    locale_dir = out_dir / locale
+    locale_dir.mkdir(parents=True, exist_ok=True)
+    champions: Dict[str, Dict[str, object]] = {}
+    summary = {"written": 0, "kept": 0, "removed": 0}
+    keep = {"manifest.json"}
+    for name in sorted(data):
+        payload = json.dumps(data[name], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()[:SHARD_HASH_LENGTH]
+        file_name = f"{name}.{digest}.json"
+        # Compression runs only for variants missing on disk: an unchanged
+        # champion keeps all three files and costs one hash.
+        variants: Dict[str, Callable[[], bytes]] = {
+            file_name: lambda: payload,
+            f"{file_name}.gz": lambda: gzip.compress(payload, compresslevel=9, mtime=0),
+        }
+        if brotli is not None:
+            variants[f"{file_name}.br"] = lambda: brotli.compress(payload, quality=11)
+        sizes: Dict[str, int] = {}
+        for variant_name, encode in variants.items():
+            keep.add(variant_name)
+            target = locale_dir / variant_name
+            if target.exists():
+                sizes[variant_name] = target.stat().st_size
+                summary["kept"] += 1
+                continue
+            blob = encode()
+            write_atomic(target, blob)
+            sizes[variant_name] = len(blob)
+            summary["written"] += 1
+        champions[name] = {
+            "file": file_name,
+            "hash": digest,
+            "bytes": len(payload),
+            "gzip": sizes[f"{file_name}.gz"],
+        }
+    for stale in locale_dir.iterdir():
+        if stale.is_file() and stale.name not in keep:
+            stale.unlink()
+            summary["removed"] += 1
+    manifest = {"locale": locale, "champions": champions}
+    write_atomic(locale_dir / "manifest.json", json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+    return summary
+
+
+def _scalars(value: object) -> Iterator[object]:
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _scalars(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _scalars(item)
+    else:
+        yield value
+
+
+def same_json(left: object, right: object) -> bool:
+    """Deep equality that also compares types, so 1, 1.0 and True are all different."""
+    if type(left) is not type(right):
+        return False
+    if isinstance(left, dict):
+        return left.keys() == right.keys() and all(same_json(item, right[key]) for key, item in left.items())
+    if isinstance(left, list):
+        return len(left) == len(right) and all(same_json(a, b) for a, b in zip(left, right))
+    return left == right
+
+
+def intern_strings(data: Dict[str, object]) -> Tuple[List[object], Dict[str, object]]:
+    """Move repeated strings and every non-string scalar into one table and reference them by index.
+
+    In the returned tree an integer is always a table index and a string is a
+    literal that occurs only once; the most frequent values get the shortest
+    indices.
+    """
+    counts = Counter((type(value), value) for value in _scalars(data))
+    table = [value for (kind, value), count in counts.most_common() if kind is not str or count > 1]
+    index = {(type(value), value): idx for idx, value in enumerate(table)}
+
+    def encode(value: object) -> object:
+        if isinstance(value, dict):
+            return {key: encode(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [encode(item) for item in value]
+        return index.get((type(value), value), value)
+
+    return table, {name: encode(entry) for name, entry in data.items()}
+
+
+def expand_interned(table: Sequence[object], value: object) -> object:
+    if type(value) is int:
+        return table[value]
+    if isinstance(value, dict):
+        return {key: expand_interned(table, item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [expand_interned(table, item) for item in value]
+    return value
+
+
+class InternedText(Mapping):
+    """Champion name -> text entry, expanded from the string table on first access."""
+
+    def __init__(self, table: Sequence[object], refs: Dict[str, object]):
+        self.table = table
+        self.refs = refs
+        self._entries: Dict[str, object] = {}
+
+    @classmethod
+    def load(cls, path: Path, locale: str) -> "InternedText":
+        document = load_js_document(path)
+        var_name = text_var_name(locale)
+        return cls(document[f"{var_name}_STRINGS"].value, document[f"{var_name}_REFS"].value)
+
+    def __getitem__(self, name: str) -> object:
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = self._entries[name] = expand_interned(self.table, self.refs[name])
+        return entry
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.refs)
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+
+# Defines the usual LOL_CHAMPIONS_TEXT_<LANG> object with one lazy getter per
+# champion, so script.js reads it unchanged. The target is assigned through
+# window[...] so parse_js_assignments only sees the two JSON payloads.
+INTERNED_DECODER = """(function (name) {
+  var strings = window[name + "_STRINGS"];
+  var refs = window[name + "_REFS"];
+  function expand(value) {
+    if (typeof value === "number") return strings[value];
+    if (Array.isArray(value)) return value.map(expand);
+    if (value && typeof value === "object") {
+      var out = {};
+      for (var key in value) out[key] = expand(value[key]);
+      return out;
+    }
+    return value;
+  }
+  var texts = {};
+  Object.keys(refs).forEach(function (champ) {
+    Object.defineProperty(texts, champ, {
+      enumerable: true,
+      configurable: true,
+      get: function () {
+        var entry = expand(refs[champ]);
+        Object.defineProperty(texts, champ, { value: entry, enumerable: true, writable: true });
+        return entry;
+      }
+    });
+  });
+  window[name] = texts;
+})(%s);
+"""
+
+
+def write_interned(locale: str, data: Dict[str, object], out_dir: Path = COMPACT_DIR) -> Dict[str, int]:
+    """Write champion_text_<locale>.js in the string-table format; fails if it does not round-trip."""
+    table, refs = intern_strings(data)
+    decoded = InternedText(table, refs)
+    if any(not same_json(decoded[name], entry) for name, entry in data.items()):
+        raise ValueError(f"Interned {locale} text does not round-trip")
+    var_name = text_var_name(locale)
+    dumps = functools.partial(json.dumps, ensure_ascii=False, separators=(",", ":"))
+    text = (
+        f"// League of Legends - Champion text ({locale}), string-table format\n"
+        "// Auto-generated by tools/resolve_placeholders.py --compact\n\n"
+        f"window.{var_name}_STRINGS = {dumps(table)};\n"
+        f"window.{var_name}_REFS = {dumps(refs)};\n"
+        + INTERNED_DECODER % json.dumps(var_name)
+    )
+    out_dir.mkdir(parents=True, exist_ok=True)
+    payload = text.encode("utf-8")
+    write_atomic(out_dir / f"champion_text_{locale}.js", payload)
+    return {
+        "bytes": len(payload),
+        "json_bytes": len(dumps(data).encode("utf-8")),
+        "strings": len(table),
+        "scalars": sum(1 for _ in _scalars(data)),
+    }
+
+
+def peak_memory_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-inflight", type=int, default=FETCH_MAX_INFLIGHT,
+                        help="maximum number of concurrent Community Dragon downloads")
+    parser.add_argument("--bin-url", default=BIN_URL,
+                        help="bin URL template with an {alias} field (e.g. a local mirror)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="revalidate every cached bin with conditional requests and exit")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="resolve champions in N worker processes")
+    parser.add_argument("--full", action="store_true",
+                        help="re-resolve every champion instead of only those whose inputs changed")
+    parser.add_argument("--shards", nargs="?", const=SHARDS_DIR, type=Path, default=None, metavar="DIR",
+                        help=f"also write per-champion, content-hashed text shards (default: {SHARDS_DIR})")
+    parser.add_argument("--compact", nargs="?", const=COMPACT_DIR, type=Path, default=None, metavar="DIR",
+                        help=f"also write string-table text files that decode lazily in the page (default: {COMPACT_DIR})")
+    parser.add_argument("--locales", type=lambda value: [item.strip() for item in value.split(",") if item.strip()],
+                        default=None, metavar="LIST",
+                        help="comma-separated locales to resolve (default: every translations/champion_text_<lang>.js)")
+    parser.add_argument("--patches", type=lambda value: [item.strip() for item in value.split(",") if item.strip()],
+                        default=None, metavar="LIST",
+                        help=f"resolve against these stored spell patches into {PATCHES_DIR}/<patch>/ instead of in place")
+    parser.add_argument("--import-patch", nargs=2, default=None, metavar=("PATCH", "DIR"),
+                        help="store the bins in DIR as spell patch PATCH and exit")
+    parser.add_argument("--list-patches", action="store_true", help="list the stored spell patches and exit")
+    parser.add_argument("--report", nargs="?", const=REPORT_PATH, type=Path, default=None, metavar="PATH",
+                        help=f"write timings and placeholder outcomes as JSON (default: {REPORT_PATH})")
+    parser.add_argument("--profile", type=Path, default=None, metavar="PATH",
+                        help="write cProfile stats for the main process (view with snakeviz, flameprof or pstats)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.refresh:
+        with BinFetcher(url_template=args.bin_url, max_inflight=args.max_inflight) as fetcher:
+            summary = fetcher.refresh()
+        debug(f"Revalidated {summary['checked']} cached bins for patch {fetcher.patch or 'unknown'}: "
+              f"{summary['changed']} changed, {summary['unchanged']} unchanged, {summary['failed']} failed")
+        return
+    if args.import_patch or args.list_patches:
+        with SpellStore() as store:
+            if args.import_patch:
+                patch, directory = args.import_patch
+                debug(f"Stored {store.import_bins(patch, Path(directory))} bins as patch {patch}")
+            for patch, count in store.patches().items():
+                debug(f"{patch:<16} {count} champions")
+        return
+
+    metrics = RunMetrics()
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        counts = run(args, metrics)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(str(args.profile))
+    print_summary(metrics, counts)
+    if args.report is not None:
+        report = metrics.report(
+            version=read_data_version(),
+            jobs=args.jobs,
+            **counts,
+            peak_memory_mb=peak_memory_mb(),
+        )
+        write_atomic(args.report, json.dumps(report, indent=1, ensure_ascii=False).encode("utf-8"))
+        debug(f"Report written to {args.report}")
+    if profiler is not None:
+        debug(f"Profile written to {args.profile}")
+
+
+def run(args: argparse.Namespace, metrics: RunMetrics) -> Dict[str, int]:
+    with metrics.stage("load"):
+        meta_doc = load_js_document(BASE_DIR / "champion_meta.js")
+        meta = meta_doc["LOL_CHAMPIONS_META"].value
+        paths = discover_locales()
+        if "en" not in paths:
+            raise LoadError("champion_text_en.js is required (it carries each champion's partype)")
+        selected = args.locales or list(paths)
+        missing = [locale for locale in selected if locale not in paths]
+        if missing:
+            raise LoadError(f"No champion_text file for locale(s): {', '.join(missing)}")
+        documents = {locale: load_js_object(paths[locale], text_var_name(locale)) for locale in paths if locale in selected}
+        en_text = documents["en"][0] if "en" in documents else load_js_object(paths["en"], text_var_name("en"))[0]
+
+    aliases = {name: normalize_alias(meta_entry.get("id", name)) for name, meta_entry in meta.items()}
+    if args.patches is not None:
+        with SpellStore() as store, metrics.stage("resolve"):
+            missing = [patch for patch in args.patches if patch not in store.patches()]
+            if missing:
+                raise LoadError(f"No stored spell patch: {', '.join(missing)} (see --list-patches)")
+            return resolve_patches(args.patches, store, meta, aliases, documents, en_text, metrics)
+
+    with metrics.stage("fetch"), BinFetcher(url_template=args.bin_url, max_inflight=args.max_inflight) as fetcher:
+        failures = fetcher.prefetch(aliases.values())
+
+    texts = tuple((locale, data) for locale, (data, _) in documents.items())
+    manifest = ResolveManifest(RESOLVE_MANIFEST_PATH, resolver_fingerprint())
+    with SpellStore() as store:
+        with metrics.stage("index"):
+            store.sync(alias for alias in aliases.values() if alias not in failures)
+            if store.snapshot(read_data_version()):
+                debug(f"Stored the cached spells as patch {read_data_version()}")
+            candidates = list(available_champions(meta, aliases, store, failures))
+            fingerprints = {
+                name: manifest.fingerprint(name, meta_entry, store.digest(alias), texts)
+                for name, meta_entry, alias in candidates
+            }
+            stale = {
+                name: list(documents) if args.full else manifest.stale_locales(name, fingerprints[name])
+                for name, _, _ in candidates
+            }
+            dirty = [champion for champion in candidates if stale[champion[0]]]
+        with metrics.stage("resolve"):
+            if args.jobs > 1:
+                resolve_parallel(args.jobs, store, dirty, texts, metrics, stale, en_text)
+            else:
+                for name, champion in iter_champions(dirty, store, en_text):
+                    pending = [(locale, data) for locale, data in texts if locale in stale[name]]
+                    resolve_champion(champion, pending, metrics)
+
+        changed_locales = set()
+        for name, meta_entry, alias in dirty:
+            fingerprint = manifest.fingerprint(name, meta_entry, store.digest(alias), texts)
+            for locale, digest in fingerprint["text"].items():
+                if digest != fingerprints[name]["text"][locale]:
+                    changed_locales.add(locale)
+            manifest.record(name, fingerprint)
+
+    with metrics.stage("dump"):
+        for locale in changed_locales:
+            data, document = documents[locale]
+            dump_js_object(document.path, text_var_name(locale), data, document)
+        manifest.save()
+
+    if args.shards is not None:
+        with metrics.stage("shards"):
+            for locale, data in texts:
+                summary = write_shards(locale, data, args.shards)
+                debug(f"Shards [{locale}]          : {summary['written']} written, {summary['kept']} kept, "
+                      f"{summary['removed']} removed")
+    if args.compact is not None:
+        with metrics.stage("compact"):
+            for locale, data in texts:
+                summary = write_interned(locale, data, args.compact)
+                debug(f"Compact [{locale}]         : {summary['bytes']} bytes ({summary['json_bytes']} as JSON), "
+                      f"{summary['strings']} table entries for {summary['scalars']} values")
+    return {
+        "champions_resolved": len(dirty),
+        "champions_total": len(candidates),
+        "locale_passes": sum(len(stale[name]) for name, _, _ in dirty),
+        "locales": len(documents),
+    }
+
+
+def print_summary(metrics: RunMetrics, counts: Dict[str, int]) -> None:
+    resolved, total = counts["champions_resolved"], counts["champions_total"]
+    counters = metrics.counters
+    debug(f"Champions resolved   : {resolved} of {total} ({total - resolved} unchanged), "
+          f"{counts['locale_passes']} locale passes over {counts['locales']} locales")
+    debug(f"Placeholders replaced: {counters.get('replaced', 0)}")
+    debug(f"Placeholders skipped : {counters.get('skipped', 0)}")
+    debug(f"Placeholders errored : {counters.get('errored', 0)}")
+    for outcome in ("skipped", "errored"):
+        for reason, count in metrics.top(metrics.reasons[outcome], 3):
+            debug(f"  {count:>6} {reason}")
+    debug(f"Expression cache     : {counters.get('compile_hits', 0)} hits, {counters.get('compile_misses', 0)} misses")
+    debug(f"Result memo          : {counters.get('memo_hits', 0)} hits, {counters.get('memo_misses', 0)} misses")
+    debug("Stages               : " + ", ".join(
+        f"{name} {seconds:.2f}s" for name, seconds in metrics.stages.items() if "." not in name
+    ))
+    slowest = metrics.top(metrics.champions, 3)
+    if slowest:
+        debug("Slowest champions    : " + ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in slowest))
+    peak = peak_memory_mb()
+    if peak is not None:
+        debug(f"Peak memory          : {peak:.1f} MB")
 
 
 if __name__ == "__main__":